@@ -0,0 +1,9 @@
+"""
+This package holds benchmarks for the data pipeline. Benchmarks are run separately in CLI, not by the test suite.
+    Command is "python -m benchmarks.file_name"
+
+Files:
+
+    - bench_ingest.py: Compares the per-row and bulk insert paths of init_processing.
+    - bench_summarize.py: Compares data_generation.summarize with the summarizer it replaced.
+"""
@@ -0,0 +1,155 @@
+# benchmarks/bench_chat_server.py
+"""
+Load-tests the chat server's /chat endpoint with concurrent clients and reports latency percentiles.
+
+By default it targets a server that is already running. With --db, it starts a server on a free local port in this
+process (serving that database) and tests it instead.
+
+Functions include:
+    - request_chat(host: str, port: int, message: str) - Sends one question and returns the time to the first byte and to the full answer.
+    - run_load_test(host: str, port: int, questions: list[str], total: int, concurrency: int) - Sends questions from concurrent clients and collects the latencies.
+    - percentile(values: list[float], p: float) - Returns the p-th percentile of a list of values.
+    - main() - Runs the load test and prints a latency table.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from file_setup import connection_pool
+from file_setup.config import server_host, server_port
+from src.server import chat_server
+from src.server.answer_engine import AnswerEngine
+
+QUESTIONS: list[str] = ["What caused the American Civil War?", "Tell me about the Ron Paul Curriculum.",
+                        "Who was Napoleon?", "What is the best way to learn history?", "Why is freedom important?",
+                        "What happened at Fort Sumter?", "How does the economy grow?", "What is a good book to read?"]
+
+
+async def request_chat(host: str, port: int, message: str) -> tuple[float, float]:
+    """
+    Sends one question on a new connection and reads the whole streamed answer.
+
+    Parameters:
+        - host (str): The server address.
+        - port (int): The server port.
+        - message (str): The question.
+
+    Returns:
+        - float: Seconds until the first byte of the response.
+        - float: Seconds until the end of the response.
+    """
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps({'message': message}).encode('utf-8')
+    writer.write(f"POST /chat HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+
+    first_byte = await reader.read(1)
+    time_to_first_byte = time.perf_counter() - start
+    response = first_byte + await reader.read()
+    total = time.perf_counter() - start
+    writer.close()
+
+    if not response.startswith(b'HTTP/1.1 200'):
+        raise RuntimeError(f"Unexpected response: {response[:80]!r}")
+    return time_to_first_byte, total
+
+
+async def run_load_test(host: str, port: int, questions: list[str], total: int, concurrency: int
+                        ) -> tuple[list[float], list[float], float]:
+    """
+    Sends total questions, cycling through the list, from concurrency clients at once.
+
+    Parameters:
+        - host (str): The server address.
+        - port (int): The server port.
+        - questions (list[str]): The questions to send.
+        - total (int): The number of requests.
+        - concurrency (int): The number of requests in flight at once.
+
+    Returns:
+        - list[float]: The time to the first byte of each request, in seconds.
+        - list[float]: The total time of each request, in seconds.
+        - float: The wall time of the whole test, in seconds.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> tuple[float, float]:
+        async with semaphore:
+            return await request_chat(host, port, questions[index % len(questions)])
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(index) for index in range(total)))
+    wall = time.perf_counter() - start
+    return [first for first, _ in results], [whole for _, whole in results], wall
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    Returns the p-th percentile of a list of values.
+
+    Parameters:
+        - values (list[float]): The values.
+        - p (float): The percentile, from 0 to 100.
+
+    Returns:
+        - float: The percentile.
+    """
+    return float(np.percentile(values, p))
+
+
+async def _run(args: argparse.Namespace) -> None:
+    host, port = args.host, args.port
+    server = None
+    if args.db:
+        # Query a copy, so starting the engine (which may build an index) never touches the original.
+        temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(temp_dir.name, 'essays.db')
+        with open(args.db, 'rb') as source, open(db_path, 'wb') as target:
+            target.write(source.read())
+        connection_pool.open_pool(db_path)
+        engine = AnswerEngine(db_path, os.path.join(temp_dir.name, 'essays.idx'))
+        executor = ThreadPoolExecutor(max_workers=args.workers)
+        server = await chat_server.start_server(engine, temp_dir.name, '127.0.0.1', 0, executor)
+        host, port = server.sockets[0].getsockname()[:2]
+
+    # One untimed round so connection setup and caches are warm.
+    await run_load_test(host, port, QUESTIONS, len(QUESTIONS), args.concurrency)
+    first_bytes, totals, wall = await run_load_test(host, port, QUESTIONS, args.requests, args.concurrency)
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent, {args.requests / wall:.1f} requests/sec")
+    print(f"{'Latency (ms)':<22}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for label, values in (("Time to first byte", first_bytes), ("Full answer", totals)):
+        print(f"{label:<22}" + ''.join(f"{percentile(values, p) * 1000:>10.1f}" for p in (50, 95, 99))
+              + f"{max(values) * 1000:>10.1f}")
+
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+        connection_pool.close_all_pools()
+        temp_dir.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=server_host, help="Address of a running chat server.")
+    parser.add_argument("--port", type=int, default=server_port, help="Port of a running chat server.")
+    parser.add_argument("--db", help="Start a server in this process for a copy of this database instead.")
+    parser.add_argument("--workers", type=int, default=4, help="Retrieval threads of the in-process server.")
+    parser.add_argument("--requests", type=int, default=500, help="Number of requests.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once.")
+    args = parser.parse_args()
+
+    asyncio.run(_run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/bench_ingest.py
+"""
+Compares init_processing.insert_into_database (one execute and commit per row) with
+init_processing.bulk_insert_into_database (executemany in one transaction) on a synthetic essay corpus.
+
+Functions include:
+    - generate_rows(count: int, words_per_essay: int, seed: int) - Generates synthetic (title, year, content) rows.
+    - time_insert(label: str, rows: list[tuple[str, int, str]], insert: Callable) - Times one insert path on a fresh database.
+    - main() - Runs the benchmark and prints a comparison table.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable
+
+from file_setup.init_processing import create_database, insert_into_database, bulk_insert_into_database
+
+SCHEMA: str = """id INTEGER PRIMARY KEY,
+                 title TEXT,
+                 year INTEGER,
+                 content TEXT"""
+
+VOCABULARY: list[str] = ["essay", "history", "science", "argument", "evidence", "author", "chapter", "theory",
+                         "culture", "economy", "language", "government", "character", "experiment", "conclusion",
+                         "society", "nature", "literature", "freedom", "energy", "journey", "ocean", "memory"]
+
+
+def generate_rows(count: int, words_per_essay: int = 400, seed: int = 0) -> list[tuple[str, int, str]]:
+    """
+    Generates synthetic (title, year, content) rows that look like processed essays.
+
+    Parameters:
+        - count (int): The number of rows to generate.
+        - words_per_essay (int): The number of words in each essay's content.
+        - seed (int): The random seed, so runs are comparable.
+
+    Returns:
+        - list[tuple[str, int, str]]: The generated rows.
+    """
+    rng = random.Random(seed)
+    return [(f"Essay {i}", rng.randint(2010, 2024), " ".join(rng.choices(VOCABULARY, k=words_per_essay)))
+            for i in range(count)]
+
+
+def time_insert(label: str, rows: list[tuple[str, int, str]], insert: Callable) -> float:
+    """
+    Times one insert path on a fresh database in a temporary directory.
+
+    Parameters:
+        - label (str): The name of the insert path, used for the database file name.
+        - rows (list[tuple[str, int, str]]): The rows to insert.
+        - insert (Callable): Called with (rows, conn, cursor) to perform the insert.
+
+    Returns:
+        - float: The elapsed time in seconds.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        conn, cursor = create_database(os.path.join(temp_dir, f"{label}.db"), 'essays', SCHEMA)
+        start = time.perf_counter()
+        insert(rows, conn, cursor)
+        elapsed = time.perf_counter() - start
+
+        inserted = cursor.execute("SELECT COUNT(*) FROM essays").fetchone()[0]
+        conn.close()
+        if inserted != len(rows):
+            raise RuntimeError(f"{label}: inserted {inserted} of {len(rows)} rows")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--essays", type=int, default=10_000, help="Number of synthetic essays.")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows per executemany call.")
+    args = parser.parse_args()
+
+    rows = generate_rows(args.essays)
+    paths: dict[str, Callable] = {
+        "per-row": lambda data, conn, cursor: insert_into_database(data, conn, cursor, 'essays'),
+        "bulk": lambda data, conn, cursor: bulk_insert_into_database(data, conn, 'essays',
+                                                                     chunk_size=args.chunk_size),
+        "bulk (WAL, synchronous=OFF)": lambda data, conn, cursor: bulk_insert_into_database(
+            data, conn, 'essays', chunk_size=args.chunk_size, fast_load=True),
+    }
+
+    results: dict[str, float] = {label: time_insert(label.split()[0], rows, insert) for label, insert in paths.items()}
+
+    baseline = results["per-row"]
+    print(f"Inserted {len(rows)} synthetic essays per path.")
+    print(f"{'Path':<30}{'Seconds':>10}{'Rows/sec':>12}{'Speedup':>10}")
+    for label, elapsed in results.items():
+        print(f"{label:<30}{elapsed:>10.3f}{len(rows) / elapsed:>12.0f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
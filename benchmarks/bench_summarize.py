@@ -0,0 +1,110 @@
+# benchmarks/bench_summarize.py
+"""
+Compares data_generation.summarize with the summarizer it replaced, which tokenized the text twice, checked dictionary
+membership twice per word and rebuilt the stop word set on every call. Needs the NLTK punkt and stopwords data.
+
+Functions include:
+    - legacy_summarize(text: str, summary_length: int) - The previous summarize implementation, without the downloads.
+    - generate_essays(count: int, sentences_per_essay: int, seed: int) - Generates long synthetic essays.
+    - main() - Runs the benchmark and prints a comparison table.
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from heapq import nlargest
+
+from nltk.corpus import stopwords
+from nltk.tokenize import sent_tokenize, word_tokenize
+
+from benchmarks.bench_ingest import VOCABULARY
+from data.data_augmentation import data_generation
+
+
+def legacy_summarize(text: str, summary_length: int) -> str:
+    """
+    The previous summarize implementation, kept here as the benchmark baseline. NLTK downloads are left out.
+
+    Parameters:
+        - text (str): The text to summarize.
+        - summary_length (int): The maximum number of sentences in the summary.
+
+    Returns:
+        - str: The summary of the text.
+    """
+    stop_words = set(stopwords.words("english"))
+    word_frequencies = defaultdict(int)
+    words = word_tokenize(text)
+
+    for word in words:
+        word = word.lower()
+        if word not in stop_words:
+            word_frequencies[word] += 1
+
+    sentence_tokens = sent_tokenize(text)
+    sentence_scores = defaultdict(int)
+
+    for sent in sentence_tokens:
+        for word in word_tokenize(sent.lower()):
+            if word in word_frequencies.keys():
+                if word in word_frequencies:
+                    sentence_scores[sent] += word_frequencies[word]
+
+    summary_sentences = nlargest(summary_length, sentence_scores, key=lambda sen: sentence_scores[sen])
+    return ' '.join(summary_sentences)
+
+
+def generate_essays(count: int, sentences_per_essay: int = 400, seed: int = 0) -> list[str]:
+    """
+    Generates long synthetic essays made of random sentences.
+
+    Parameters:
+        - count (int): The number of essays to generate.
+        - sentences_per_essay (int): The number of sentences in each essay.
+        - seed (int): The random seed, so runs are comparable.
+
+    Returns:
+        - list[str]: The generated essays.
+    """
+    rng = random.Random(seed)
+    words = VOCABULARY + ["the", "and", "of", "a", "is", "in", "that", "with"]
+    return [" ".join(" ".join(rng.choices(words, k=rng.randint(8, 25))).capitalize() + "."
+                     for _ in range(sentences_per_essay))
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--essays", type=int, default=50, help="Number of synthetic essays.")
+    parser.add_argument("--sentences", type=int, default=400, help="Sentences per essay.")
+    parser.add_argument("--summary-length", type=int, default=5, help="Sentences per summary.")
+    args = parser.parse_args()
+
+    essays = generate_essays(args.essays, args.sentences)
+    data_generation.summarize(essays[0], args.summary_length)  # Load NLTK resources outside the timings.
+
+    results: dict[str, float] = {}
+    start = time.perf_counter()
+    for essay in essays:
+        legacy_summarize(essay, args.summary_length)
+    results["legacy"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for essay in essays:
+        data_generation.summarize(essay, args.summary_length)
+    results["summarize (per essay)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data_generation.summarize(essays, args.summary_length)
+    results["summarize (list)"] = time.perf_counter() - start
+
+    baseline = results["legacy"]
+    print(f"Summarized {len(essays)} essays of {args.sentences} sentences each.")
+    print(f"{'Path':<25}{'Seconds':>10}{'Essays/sec':>12}{'Speedup':>10}")
+    for label, elapsed in results.items():
+        print(f"{label:<25}{elapsed:>10.3f}{len(essays) / elapsed:>12.1f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,57 +1,101 @@
 # data\data_augmentation\augment.py
 
+import sys
+
 from data.data_augmentation import data_query, data_generation
-from file_setup import init_processing
+from file_setup import connection_pool, ingest_manifest, init_processing, nlp_resources
 from file_setup.init_processing import *
 from file_setup.config import *
+from src.model import embedding_index
+
+
+def main(incremental: bool = False, summary_method: str = 'frequency'):
+    """
+    Builds the essays table and fills in its full_text, summary and keywords columns.
+
+    Parameters:
+        - incremental (bool): Whether to only ingest and augment essays that are new or changed since the last run,
+          using the ingest manifest. Default is False, which re-processes the whole dataset directory.
+        - summary_method (str): 'frequency' or 'tfidf', see data_generation.summarize. For 'tfidf', IDF statistics
+          are fitted once over the full_text of the whole essays table. Default is 'frequency'.
+
+    Returns:
+        - None
+    """
+    essay_ids: list[int] | None = None
+    if incremental:
+        print("Ingesting new or changed essays...")
+        essay_ids = ingest_manifest.incremental_ingest(essay_db_path, dataset_dir)
+        if not essay_ids:
+            print("No new or changed essays.")
+            return
+        print(f"Ingested {len(essay_ids)} new or changed essays.")
+    else:
+        print("Initializing database...")
+        init_processing.main()
+        print("Database initialized. Database:", essay_db_path, "\nTable:", 'essays', "\nColumns:", 'title', 'year',
+              'content')
+
+    # Share one connection across the per-essay data_query calls below instead of opening one per call.
+    with connection_pool.pooled(essay_db_path):
+        print("Initializing test data...")
+        if not data_query.column_exists(essay_db_path, 'essays', 'full_text'):
+            data_query.add_database_column(essay_db_path, 'essays', 'full_text')
+        if not data_query.column_exists(essay_db_path, 'essays', 'summary'):
+            data_query.add_database_column(essay_db_path, 'essays', 'summary')
+        if not data_query.column_exists(essay_db_path, 'essays', 'keywords'):
+            data_query.add_database_column(essay_db_path, 'essays', 'keywords')
 
+        if not incremental and data_query.is_column_empty_or_null(essay_db_path, 'essays', 'full_text'):
+            print("Reading file content...")
+            full_content = read_file_content(dataset_dir)
 
-def main():
-    print("Initializing database...")
-    init_processing.main()
-    print("Database initialized. Database:", essay_db_path, "\nTable:", 'essays', "\nColumns:", 'title', 'year',
-          'content')
+            print("Inserting data...")
+            for title, year, content in full_content:
+                essay_id = data_query.retrieve_id_from_database(essay_db_path, 'essays', 'title', title)
+                if essay_id is not None:
+                    data_query.update_database_cell(essay_db_path, 'essays', essay_id, 'full_text', content)
+                else:
+                    print(f"Skipping {title}...")
 
-    print("Initializing test data...")
-    if not data_query.column_exists(essay_db_path, 'essays', 'full_text'):
-        data_query.add_database_column(essay_db_path, 'essays', 'full_text')
-    if not data_query.column_exists(essay_db_path, 'essays', 'summary'):
-        data_query.add_database_column(essay_db_path, 'essays', 'summary')
-    if not data_query.column_exists(essay_db_path, 'essays', 'keywords'):
-        data_query.add_database_column(essay_db_path, 'essays', 'keywords')
+            print("Done updating database!")
 
-    if data_query.is_column_empty_or_null(essay_db_path, 'essays', 'full_text'):
-        print("Reading file content...")
-        full_content = read_file_content(dataset_dir)
+        print("Generating data...")
+        conn, cursor = open_database(essay_db_path)
+        if essay_ids is None:
+            cursor.execute("SELECT id, full_text FROM essays")
+        else:
+            placeholders = ', '.join(['?'] * len(essay_ids))
+            cursor.execute(f"SELECT id, full_text FROM essays WHERE id IN ({placeholders})", essay_ids)
 
-        print("Inserting data...")
-        for title, year, content in full_content:
-            essay_id = data_query.retrieve_id_from_database(essay_db_path, 'essays', 'title', title)
-            if essay_id is not None:
-                data_query.update_database_cell(essay_db_path, 'essays', essay_id, 'full_text', content)
-            else:
-                print(f"Skipping {title}...")
+        rows = cursor.fetchall()
+        full_texts = [full_text for _, full_text in rows]
+        entities = data_generation.extract_entities_batch(full_texts)
 
-        print("Done updating database!")
+        if summary_method == 'tfidf':
+            corpus = [full_text for (full_text,) in cursor.execute("SELECT full_text FROM essays")]
+            vectorizer = data_generation.fit_tfidf(corpus)
+            summaries = data_generation.summarize(full_texts, 5, method='tfidf', vectorizer=vectorizer)
+        else:
+            summaries = [data_generation.summarize(full_text, 5) for full_text in full_texts]
 
-    print("Generating data...")
-    conn, cursor = open_database(essay_db_path)
-    cursor.execute("SELECT id, full_text FROM essays")
+        for (essay_id, full_text), summary, essay_entities in zip(rows, summaries, entities):
+            data_query.update_database_cell(essay_db_path, 'essays', essay_id, 'summary', summary)
+            keywords: str = ', '.join(['{} ({})'.format(entity, label) for entity, label in essay_entities])
+            data_query.update_database_cell(essay_db_path, 'essays', essay_id, 'keywords', keywords)
 
-    for row in cursor.fetchall():
-        essay_id, full_text = row
-        summary: str = data_generation.summarize(full_text, 5)
-        data_query.update_database_cell(essay_db_path, 'essays', essay_id, 'summary', summary)
-        keywords: str = ', '.join(
-            ['{} ({})'.format(entity, label) for entity, label in data_generation.extract_entities(full_text)])
-        data_query.update_database_cell(essay_db_path, 'essays', essay_id, 'keywords', keywords)
+        print("Done!")
 
-    print("Done!")
+        data_query.create_search_index(essay_db_path, 'essays')
+        # Only re-embeds the essays processed above, and only once an embedding index has been built.
+        embedding_index.update_embedding_index(essay_db_path, [essay_id for essay_id, _ in rows])
 
-    print(data_query.retrieve_table_data(essay_db_path, 'essays'))
-    print("Closing database...")
-    close_database(conn)
+        print(data_query.retrieve_table_data(essay_db_path, 'essays'))
+        print("Closing database...")
+        close_database(conn)
 
 
 if __name__ == '__main__':
-    main()
+    nlp_resources.preload()
+    main(incremental='--incremental' in sys.argv,
+         summary_method='tfidf' if '--tfidf' in sys.argv else 'frequency')
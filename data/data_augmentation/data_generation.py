@@ -4,58 +4,172 @@ This module contains functions for data generation.
 
 Functions:
 
-    - summarize(text: str, summary_length: int) - Summarize text using NLTK and return the summary as a string.
+    - summarize(text: str | list[str], summary_length: int, method: str, vectorizer: TfidfVectorizer) - Summarize text (or a list of texts) using NLTK and return the summary as a string.
+    - fit_tfidf(texts: Iterable[str]) - Fit a TF-IDF vectorizer over a corpus.
+    - summarize_tfidf(text: str | list[str], summary_length: int, vectorizer: TfidfVectorizer) - Summarize text by TF-IDF similarity to the whole text.
     - extract_entities(text: str) - Extract entities from text using spacy
+    - extract_entities_batch(texts: Iterable[str], batch_size: int, n_process: int) - Extract entities from many texts with one spacy pipe
+
+Models and NLTK resources come from file_setup.nlp_resources, so they are loaded once per process.
 """
 
 import nltk
 import spacy
-from nltk.corpus import stopwords
 from nltk.tokenize import sent_tokenize, word_tokenize
-from collections import defaultdict
+from collections import Counter
 from heapq import nlargest
+from itertools import accumulate
+from typing import Iterable
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from file_setup import nlp_resources
 
 
-def summarize(text: str, summary_length: int) -> str:
+def summarize(text: str | list[str], summary_length: int, method: str = 'frequency',
+              vectorizer: TfidfVectorizer | None = None) -> str | list[str]:
     """
     Summarize text using NLTK and return the summary as a string.
 
+    With the 'frequency' method, each sentence is tokenized once. Word frequencies and sentence scores are both
+    computed from that single token stream. With the 'tfidf' method, see summarize_tfidf. Either way, the highest
+    scoring sentences are returned in the order they appear in the text.
+
     Parameters:
-        - text (str): The text to summarize.
+        - text (str | list[str]): The text to summarize, or a list of texts to summarize in one call.
+        - summary_length (int): The maximum number of sentences in each summary.
+        - method (str): 'frequency' to score sentences by raw word counts, or 'tfidf'. Default is 'frequency'.
+        - vectorizer (TfidfVectorizer | None): A vectorizer from fit_tfidf, for the 'tfidf' method.
 
     Returns:
-        - summary (str): The summary of the text.
-    '''
+        - summary (str | list[str]): The summary of the text, or one summary per text if a list was given.
+    """
+    if method == 'tfidf':
+        return summarize_tfidf(text, summary_length, vectorizer)
+    if method != 'frequency':
+        raise ValueError(f"Unknown summarization method: {method}")
+
+    nlp_resources.ensure_nltk_resources(("punkt", "punkt_tab", "stopwords"))
+    stop_words = nlp_resources.get_stop_words()
+
+    if isinstance(text, str):
+        return _summarize_text(text, summary_length, stop_words)
+    return [_summarize_text(single_text, summary_length, stop_words) for single_text in text]
+
+
+def _summarize_text(text: str, summary_length: int, stop_words: frozenset[str]) -> str:
+    sentences: list[str] = sent_tokenize(text)
+
+    # Tokens of every sentence in one flat list; sentence i owns tokens[offsets[i]:offsets[i + 1]].
+    tokens: list[str] = []
+    offsets: list[int] = [0]
+    for sentence in sentences:
+        # preserve_line skips word_tokenize's own sentence split, since sentences are already split.
+        tokens.extend(word_tokenize(sentence.lower(), preserve_line=True))
+        offsets.append(len(tokens))
+
+    word_frequencies = Counter(token for token in tokens if token not in stop_words)
+    cumulative_scores = [0, *accumulate(word_frequencies.get(token, 0) for token in tokens)]
+
+    sentence_scores: dict[int, int] = {}
+    seen: set[str] = set()
+    for index, sentence in enumerate(sentences):
+        score = cumulative_scores[offsets[index + 1]] - cumulative_scores[offsets[index]]
+        if score > 0 and sentence not in seen:
+            sentence_scores[index] = score
+            seen.add(sentence)
+
+    top_indices = nlargest(summary_length, sentence_scores, key=sentence_scores.__getitem__)
+    return ' '.join(sentences[index] for index in sorted(top_indices))
+
+
+def fit_tfidf(texts: Iterable[str]) -> TfidfVectorizer:
     """
-    nltk.download("punkt")
-    nltk.download("stopwords")
+    Fit a TF-IDF vectorizer over a corpus, e.g. the full_text column of the essays table, so its IDF statistics can
+    be reused to summarize every essay.
 
-    stop_words = set(stopwords.words("english"))
-    word_frequencies = defaultdict(int)
-    words = word_tokenize(text)
+    Parameters:
+        - texts (Iterable[str]): The corpus. None is treated as an empty text.
 
-    for word in words:
-        word = word.lower()
-        if word not in stop_words:
-            word_frequencies[word] += 1
+    Returns:
+        - TfidfVectorizer: The fitted vectorizer.
+    """
+    vectorizer = TfidfVectorizer(stop_words='english', sublinear_tf=True)
+    vectorizer.fit(text or '' for text in texts)
+    return vectorizer
 
-    sentence_tokens = sent_tokenize(text)
-    sentence_scores = defaultdict(int)
 
-    for sent in sentence_tokens:
-        for word in word_tokenize(sent.lower()):
-            if word in word_frequencies.keys():
-                if word in word_frequencies:
-                    sentence_scores[sent] += word_frequencies[word]
+def summarize_tfidf(text: str | list[str], summary_length: int,
+                    vectorizer: TfidfVectorizer | None = None) -> str | list[str]:
+    """
+    Summarize text by scoring each sentence with the cosine similarity between its TF-IDF vector and the TF-IDF vector
+    of the whole text, so sentences about what the text is mostly about win over sentences with many common words.
 
-    summary_sentences = nlargest(summary_length, sentence_scores, key=lambda sen: sentence_scores[sen])
-    return ' '.join(summary_sentences)
+    All sentences of all texts are scored together with sparse matrix operations.
+
+    Parameters:
+        - text (str | list[str]): The text to summarize, or a list of texts to summarize in one call.
+        - summary_length (int): The maximum number of sentences in each summary.
+        - vectorizer (TfidfVectorizer | None): A vectorizer from fit_tfidf. If None, one is fitted on the given texts.
+
+    Returns:
+        - summary (str | list[str]): The summary of the text, or one summary per text if a list was given.
+    """
+    texts: list[str] = [text] if isinstance(text, str) else [single_text or '' for single_text in text]
+    if vectorizer is None:
+        vectorizer = fit_tfidf(texts)
+
+    nlp_resources.ensure_nltk_resources(("punkt", "punkt_tab"))
+    sentences_per_text: list[list[str]] = [sent_tokenize(single_text) for single_text in texts]
+    sentences: list[str] = [sentence for text_sentences in sentences_per_text for sentence in text_sentences]
+    boundaries = np.cumsum([0] + [len(text_sentences) for text_sentences in sentences_per_text])
+
+    summaries: list[str] = [''] * len(texts)
+    if sentences:
+        # Rows are L2-normalized, so the row-wise dot product with the owning text's vector is the cosine similarity.
+        owners = np.repeat(np.arange(len(texts)), np.diff(boundaries))
+        sentence_matrix = vectorizer.transform(sentences)
+        text_matrix = vectorizer.transform(texts)
+        scores = np.asarray(sentence_matrix.multiply(text_matrix[owners]).sum(axis=1)).ravel()
+
+        for index, text_sentences in enumerate(sentences_per_text):
+            text_scores = scores[boundaries[index]:boundaries[index + 1]]
+            candidates = np.flatnonzero(text_scores > 0)
+            if len(candidates) > summary_length:
+                candidates = candidates[np.argpartition(-text_scores[candidates], summary_length - 1)[:summary_length]]
+            summaries[index] = ' '.join(text_sentences[position] for position in np.sort(candidates))
+
+    return summaries[0] if isinstance(text, str) else summaries
 
 
 def extract_entities(text: str) -> list[tuple[str, str]]:
-    nlp = spacy.load('en_core_web_sm')
+    nlp = nlp_resources.get_spacy_model('en_core_web_sm')
 
     doc = nlp(text)
 
     entities = [(entity.text, entity.label_) for entity in doc.ents]
     return entities
+
+
+# Pipeline components that named entity recognition doesn't depend on. en_core_web_sm's ner has its own tok2vec.
+NER_UNUSED_COMPONENTS: tuple[str, ...] = ('tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter')
+
+
+def extract_entities_batch(texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> list[list[tuple[str, str]]]:
+    """
+    Extract entities from many texts with one spacy pipe, skipping the components that entity recognition doesn't need.
+
+    Parameters:
+        - texts (Iterable[str]): The texts to extract entities from. None is treated as an empty text.
+        - batch_size (int): The number of texts spacy processes per batch. Default is 64.
+        - n_process (int): The number of processes spacy uses. Default is 1.
+
+    Returns:
+        - list[list[tuple[str, str]]]: The (entity, label) pairs of each text, in the same order as texts.
+    """
+    nlp = nlp_resources.get_spacy_model('en_core_web_sm')
+    disable = [name for name in NER_UNUSED_COMPONENTS if name in nlp.pipe_names]
+
+    docs = nlp.pipe((text or '' for text in texts), batch_size=batch_size, n_process=n_process, disable=disable)
+    return [[(entity.text, entity.label_) for entity in doc.ents] for doc in docs]
@@ -2,6 +2,9 @@
 """
 This file contains functions for querying and manipulating data in a SQLite database.
 
+Every function gets its connection from file_setup.connection_pool.connect, so while a pool is open for the database
+path (see connection_pool.pooled) the calls share one connection per thread instead of opening a new one each time.
+
 Functions include:
 
     - column_exists(db_path: str, table_name: str, column_name: str) - Check if a column exists in a table within a SQLite database.
@@ -17,14 +20,19 @@ Functions include:
     - insert_into_database(db_path: str, table_name: str, column_name: str, data: Any) - Insert data into the specified table in the database.
     - retrieve_table_data(db_path: str, table_name: str) - Retrieves the data from the specified table in the database.
     - create_dataframe(table_name: str) - Create a dataframe from the specified table and return it.
+    - create_search_index(db_path: str, table_name: str) - Create an FTS5 full-text index over the essay text columns, kept in sync by triggers.
+    - drop_search_index(db_path: str, table_name: str) - Drop the full-text index and its triggers.
+    - search_essays(query: str, k: int, db_path: str, table_name: str) - Return the k best matching essays for a query, ranked by BM25, with snippets.
 """
 
+import re
 from typing import Any
 
 import pandas as pd
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
 
 from file_setup import config
-from file_setup.init_processing import open_database, close_database
+from file_setup.connection_pool import connect
 
 
 def column_exists(db_path: str, table_name: str, column_name: str) -> bool:
@@ -39,17 +47,14 @@ def column_exists(db_path: str, table_name: str, column_name: str) -> bool:
     Returns:
         - bool: True if the column exists, False otherwise.
     """
-    conn, cursor = open_database(db_path)
-
-    cursor.execute(f"PRAGMA table_info({table_name})")
-    columns = cursor.fetchall()
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        columns = cursor.fetchall()
 
     for col in columns:
         if col[1] == column_name:
-            close_database(conn)
             return True
 
-    close_database(conn)
     return False
 
 
@@ -65,10 +70,9 @@ def is_column_empty_or_null(db_path: str, table_name: str, column_name: str) ->
     Returns:
         - bool: True if any row in the column is empty or null, False otherwise.
     """
-    conn, cursor = open_database(db_path)
-    cursor.execute(f"SELECT COUNT(*) FROM {table_name} WHERE {column_name} IS NULL OR {column_name} = ''")
-    count = cursor.fetchone()[0]
-    close_database(conn)
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(f"SELECT COUNT(*) FROM {table_name} WHERE {column_name} IS NULL OR {column_name} = ''")
+        count = cursor.fetchone()[0]
     return count > 0
 
 
@@ -84,16 +88,14 @@ def find_all_duplicates(db_path: str, table_name: str, column_names: list[str])
     Returns:
         - dict[tuple, list[int]]: A dictionary with tuples of duplicated values as keys and lists of their corresponding row IDs as values.
     """
-    conn, cursor = open_database(db_path)
-
     columns_str: str = ', '.join(column_names)
 
-    cursor.execute(
-        f"SELECT {columns_str}, COUNT(*), GROUP_CONCAT(id) FROM {table_name} GROUP BY {columns_str} HAVING COUNT(*) > 1")
-    rows = cursor.fetchall()
-    duplicates = {tuple(row[:-2]): [int(row_id) for row_id in row[-1].split(',')] for row in rows}
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(
+            f"SELECT {columns_str}, COUNT(*), GROUP_CONCAT(id) FROM {table_name} GROUP BY {columns_str} HAVING COUNT(*) > 1")
+        rows = cursor.fetchall()
 
-    close_database(conn)
+    duplicates = {tuple(row[:-2]): [int(row_id) for row_id in row[-1].split(',')] for row in rows}
     return duplicates
 
 
@@ -109,14 +111,14 @@ def add_database_column(db_path: str, table_name: str, column_name: str) -> None
     Returns:
         - None
     """
-    conn, cursor = open_database(db_path)
-    cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} TEXT")
-    close_database(conn)
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} TEXT")
 
 
 def drop_database_column(db_path: str, table_name: str, column_name: str) -> None:
     """
-    Drops the specified column from the given database table.
+    Drops the specified column from the given database table. If the column is indexed for full-text search, the
+    search index is dropped too and has to be recreated with create_search_index.
 
     Parameters:
         - db_path (str): The path to the database.
@@ -126,9 +128,11 @@ def drop_database_column(db_path: str, table_name: str, column_name: str) -> Non
     Returns:
         None
     """
-    conn, cursor = open_database(db_path)
-    cursor.execute(f"ALTER TABLE {table_name} DROP COLUMN {column_name}")
-    close_database(conn)
+    with connect(db_path) as (conn, cursor):
+        if column_name in SEARCH_COLUMNS:
+            # SQLite refuses to drop a column that a trigger uses, so the search index has to go first.
+            _drop_search_index(cursor, table_name)
+        cursor.execute(f"ALTER TABLE {table_name} DROP COLUMN {column_name}")
 
 
 def delete_row_by_id(db_path: str, table_name: str, row_id: int) -> None:
@@ -143,10 +147,9 @@ def delete_row_by_id(db_path: str, table_name: str, row_id: int) -> None:
     Returns:
         - None
     """
-    conn, cursor = open_database(db_path)
-    cursor.execute(f"DELETE FROM {table_name} WHERE id = ?", (row_id,))
-    conn.commit()
-    close_database(conn)
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(f"DELETE FROM {table_name} WHERE id = ?", (row_id,))
+        conn.commit()
 
 
 def update_database_column(db_path: str, table_name: str, column_name: str, value: str | int) -> None:
@@ -162,9 +165,8 @@ def update_database_column(db_path: str, table_name: str, column_name: str, valu
     Returns:
         - None
     """
-    conn, cursor = open_database(db_path)
-    cursor.execute(f"UPDATE {table_name} SET {column_name} = '{value}'")
-    close_database(conn)
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(f"UPDATE {table_name} SET {column_name} = '{value}'")
 
 
 def update_database_cell(db_path: str, table_name: str, row_id: int, column_name: str, value: str | int) -> None:
@@ -181,9 +183,8 @@ def update_database_cell(db_path: str, table_name: str, row_id: int, column_name
     Returns:
         - None
     """
-    conn, cursor = open_database(db_path)
-    cursor.execute(f"UPDATE {table_name} SET {column_name} = ? WHERE id = ?", (value, row_id))
-    close_database(conn)
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(f"UPDATE {table_name} SET {column_name} = ? WHERE id = ?", (value, row_id))
 
 
 def retrieve_id_from_database(db_path: str, table_name: str, column_name: str, value: str) -> int | None:
@@ -199,10 +200,9 @@ def retrieve_id_from_database(db_path: str, table_name: str, column_name: str, v
     Returns:
         - int: The retrieved ID.
     """
-    conn, cursor = open_database(db_path)
-    cursor.execute(f"SELECT id FROM {table_name} WHERE {column_name} = ?", (value,))
-    row_id = cursor.fetchone()
-    close_database(conn)
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(f"SELECT id FROM {table_name} WHERE {column_name} = ?", (value,))
+        row_id = cursor.fetchone()
     return row_id[0] if row_id else None
 
 
@@ -219,9 +219,8 @@ def rename_database_column(db_path: str, table_name: str, old_column_name: str,
     Returns:
         - None
     """
-    conn, cursor = open_database(db_path)
-    cursor.execute(f"ALTER TABLE {table_name} RENAME COLUMN {old_column_name} TO {new_column_name}")
-    close_database(conn)
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(f"ALTER TABLE {table_name} RENAME COLUMN {old_column_name} TO {new_column_name}")
 
 
 def insert_into_database(db_path: str, table_name: str, column_names: list[str], data: Any) -> None:
@@ -237,13 +236,11 @@ def insert_into_database(db_path: str, table_name: str, column_names: list[str],
     Returns:
         - None
     """
-    conn, cursor = open_database(db_path)
-
     # noinspection PyTypeChecker
     placeholders = ', '.join(['?'] * len(column_names))
     columns = ', '.join(column_names)
-    cursor.executemany(f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})", data)
-    close_database(conn)
+    with connect(db_path) as (conn, cursor):
+        cursor.executemany(f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})", data)
 
 
 def retrieve_table_data(db_path: str, table_name: str) -> pd.DataFrame:
@@ -257,10 +254,9 @@ def retrieve_table_data(db_path: str, table_name: str) -> pd.DataFrame:
     Returns:
         - pd.DataFrame: The retrieved data as a pandas DataFrame.
     """
-    conn, cursor = open_database(db_path)
-    cursor.execute(f"SELECT * FROM {table_name}")
-    df = pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description])
-    close_database(conn)
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(f"SELECT * FROM {table_name}")
+        df = pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description])
     return df
 
 
@@ -274,12 +270,119 @@ def create_dataframe(table_name: str) -> pd.DataFrame:
     Returns:
         - pd.DataFrame: The dataframe created from the specified table.
     """
-    conn, cursor = open_database(config.essay_db_path)
-    cursor.execute(f"SELECT * FROM {table_name}")
-    df = pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description])
-    close_database(conn)
+    with connect(config.essay_db_path) as (conn, cursor):
+        cursor.execute(f"SELECT * FROM {table_name}")
+        df = pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description])
     return df
 
 
+
+# Columns indexed by create_search_index, in the order used by the FTS5 table.
+SEARCH_COLUMNS: tuple[str, ...] = ('title', 'content', 'full_text', 'summary', 'keywords')
+# BM25 weight of a match in each column; matches in titles and keywords say more about an essay than body text.
+SEARCH_WEIGHTS: dict[str, float] = {'title': 5.0, 'content': 1.0, 'full_text': 1.0, 'summary': 2.0, 'keywords': 3.0}
+
+
+def create_search_index(db_path: str, table_name: str = 'essays') -> None:
+    """
+    Create an FTS5 full-text index over the title, content, full_text, summary and keywords columns of the table.
+
+    The index is an external-content FTS5 table named <table_name>_fts, so the text is not stored twice. Triggers keep
+    it in sync with every insert, delete and update of the table. If the index already exists, nothing is rebuilt.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+        - table_name (str): The name of the table to index. Default is 'essays'.
+
+    Returns:
+        - None
+    """
+    fts_table = f"{table_name}_fts"
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f"new.{column}" for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f"old.{column}" for column in SEARCH_COLUMNS)
+
+    with connect(db_path) as (conn, cursor):
+        exists = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                (fts_table,)).fetchone()
+        if exists:
+            return
+
+        cursor.execute(f"CREATE VIRTUAL TABLE {fts_table} USING fts5({columns}, content='{table_name}', "
+                       f"content_rowid='id', tokenize='porter unicode61')")
+        cursor.execute(f"""CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table_name} BEGIN
+                               INSERT INTO {fts_table} (rowid, {columns}) VALUES (new.id, {new_values});
+                           END""")
+        cursor.execute(f"""CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table_name} BEGIN
+                               INSERT INTO {fts_table} ({fts_table}, rowid, {columns})
+                               VALUES ('delete', old.id, {old_values});
+                           END""")
+        cursor.execute(f"""CREATE TRIGGER {fts_table}_au AFTER UPDATE OF {columns} ON {table_name} BEGIN
+                               INSERT INTO {fts_table} ({fts_table}, rowid, {columns})
+                               VALUES ('delete', old.id, {old_values});
+                               INSERT INTO {fts_table} (rowid, {columns}) VALUES (new.id, {new_values});
+                           END""")
+        cursor.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+
+def _drop_search_index(cursor: Any, table_name: str) -> None:
+    fts_table = f"{table_name}_fts"
+    for suffix in ('ai', 'ad', 'au'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}")
+    cursor.execute(f"DROP TABLE IF EXISTS {fts_table}")
+
+
+def drop_search_index(db_path: str, table_name: str = 'essays') -> None:
+    """
+    Drop the full-text index created by create_search_index and its triggers.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+        - table_name (str): The name of the indexed table. Default is 'essays'.
+
+    Returns:
+        - None
+    """
+    with connect(db_path) as (conn, cursor):
+        _drop_search_index(cursor, table_name)
+
+
+def search_essays(query: str, k: int = 5, db_path: str = config.essay_db_path,
+                  table_name: str = 'essays') -> list[tuple[int, str, float, str]]:
+    """
+    Return the k essays that best match a free-text query, ranked by BM25, using the index from create_search_index.
+
+    The words of the query are matched with OR, so essays matching more (and rarer) words rank higher. Stop words,
+    punctuation and FTS5 operators in the query are ignored.
+
+    Parameters:
+        - query (str): The free-text query, e.g. a question from the chatbot.
+        - k (int): The maximum number of results. Default is 5.
+        - db_path (str): The path to the database file. Default is the essay database.
+        - table_name (str): The name of the indexed table. Default is 'essays'.
+
+    Returns:
+        - list[tuple[int, str, float, str]]: The id, title, score (higher is better), and a snippet of each match.
+    """
+    terms = [term for term in re.findall(r"\w+", query.lower()) if term not in ENGLISH_STOP_WORDS]
+    if not terms:
+        return []
+
+    fts_table = f"{table_name}_fts"
+    match = ' OR '.join(f'"{term}"' for term in dict.fromkeys(terms))
+    weights = ', '.join(str(SEARCH_WEIGHTS[column]) for column in SEARCH_COLUMNS)
+    with connect(db_path) as (conn, cursor):
+        cursor.execute(
+            f"""SELECT {table_name}.id, {table_name}.title, -bm25({fts_table}, {weights}) AS score,
+                       snippet({fts_table}, -1, '[', ']', '...', 16)
+                FROM {fts_table} JOIN {table_name} ON {table_name}.id = {fts_table}.rowid
+                WHERE {fts_table} MATCH ?
+                ORDER BY score DESC
+                LIMIT ?""",
+            (match, k))
+        results = cursor.fetchall()
+
+    return results
+
 if __name__ == '__main__':
     print("Creating dataframe...")
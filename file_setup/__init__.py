@@ -4,5 +4,10 @@ Package containing all functions for the setup of the project.
 Files:
     
     - init_processing.py: Functions for processing files.
+    - connection_pool.py: Shared, per-thread SQLite connections for the database functions.
+    - ingest_manifest.py: Incremental ingestion of new or changed essay files.
+    - nlp_resources.py: Process-wide registry of spaCy models and NLTK resources.
+    - lemma_cache.py: Bounded LRU cache of lemmas used by process_content.
+    - ingest_pipeline.py: Streaming, multi-stage ingest from the essay directory to the database.
     - config.py: Configuration file for the project.
 '''
\ No newline at end of file
@@ -14,9 +14,14 @@ Variables:
     - logging_path: The path to the logging directory.
     - log_path: The path to the log file.
     - essay_health_path: The path to the essay health report.
+    - lemma_cache_path: The path to the saved lemma cache.
+    - essay_index_path: The path to the saved inverted index of the essays.
+    - embedding_index_path: The path to the saved essay embeddings. Its sidecar files share this path as a prefix.
     - src_dir: The directory where the source code is stored.
     - web_dir: The directory where the web app is stored.
     - model_dir: The directory where the model is stored.
+    - server_host: The address the chat server listens on.
+    - server_port: The port the chat server listens on.
 """
 
 dataset_dir: str = "C:\\Users\\Sarah\\Documents\\AI-Creation\\Machine Learning\\Datasets\\Essays"
@@ -35,7 +40,13 @@ logging_path: str = "C:\\Users\\Sarah\\Documents\\AI-Creation\\Machine Learning\
 log_path: str = "C:\\Users\\Sarah\\Documents\\AI-Creation\\Machine Learning\\Chatbot\\logging\\log.txt"
 
 essay_health_path: str = "C:\\Users\\Sarah\\Documents\\AI-Creation\\Machine Learning\\Chatbot\\data\\essays\\database_health_report.txt"
+lemma_cache_path: str = "C:\\Users\\Sarah\\Documents\\AI-Creation\\Machine Learning\\Chatbot\\data\\essays\\lemma_cache.json"
+essay_index_path: str = "C:\\Users\\Sarah\\Documents\\AI-Creation\\Machine Learning\\Chatbot\\data\\essays\\essays.idx"
+embedding_index_path: str = "C:\\Users\\Sarah\\Documents\\AI-Creation\\Machine Learning\\Chatbot\\data\\essays\\essays.vec"
 
 src_dir: str = "C:\\Users\\Sarah\\Documents\\AI-Creation\\Machine Learning\\Chatbot\\src"
 web_dir: str = "C:\\Users\\Sarah\\Documents\\AI-Creation\\Machine Learning\\Chatbot\\src\\web"
 model_dir: str = "C:\\Users\\Sarah\\Documents\\AI-Creation\\Machine Learning\\Chatbot\\src\\model"
+
+server_host: str = "127.0.0.1"
+server_port: int = 8000
@@ -0,0 +1,208 @@
+# file_setup\connection_pool.py
+"""
+This file contains a connection manager that lets database functions share SQLite connections.
+
+Connections are pooled per database path and per thread, since a sqlite3 connection should not be used from a thread
+other than the one that created it. Reusing a connection also reuses its prepared statement cache, so repeated
+queries (e.g. one UPDATE per essay) are only compiled once.
+
+Pooling is opt-in. While no pool is open for a path, connect() opens and closes a connection for every call, exactly
+like open_database/close_database.
+
+Functions include:
+
+    - open_pool(db_path: str, cached_statements: int) - Opens (or re-enters) the connection pool for a database path.
+    - close_pool(db_path: str) - Leaves the connection pool for a database path, closing it on the last exit.
+    - get_pool(db_path: str) - Returns the open connection pool for a database path, if any.
+    - pooled(db_path: str, cached_statements: int) - Context manager that keeps a pool open for the duration of a block.
+    - connect(db_path: str) - Context manager that yields a connection and cursor, pooled if a pool is open.
+    - close_all_pools() - Closes every open connection pool.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from file_setup import init_processing
+
+
+DEFAULT_CACHED_STATEMENTS: int = 256
+
+
+class ConnectionPool:
+    """
+    A set of SQLite connections to one database, one per thread.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+        - cached_statements (int): The size of each connection's prepared statement cache.
+    """
+
+    def __init__(self, db_path: str, cached_statements: int = DEFAULT_CACHED_STATEMENTS):
+        self.db_path: str = db_path
+        self.cached_statements: int = cached_statements
+        self.users: int = 0
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> tuple[sqlite3.Connection, sqlite3.Cursor]:
+        """
+        Returns the calling thread's connection to the database, creating it on first use.
+
+        Returns:
+            - A tuple containing the connection and a fresh cursor.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread is left off so close() can run from whichever thread closes the pool.
+            conn = sqlite3.connect(self.db_path, cached_statements=self.cached_statements, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn, conn.cursor()
+
+    def close(self) -> None:
+        """
+        Commits and closes every connection in the pool.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.commit()
+            conn.close()
+        self._local = threading.local()
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(db_path: str) -> str:
+    return os.path.abspath(db_path)
+
+
+def open_pool(db_path: str, cached_statements: int = DEFAULT_CACHED_STATEMENTS) -> ConnectionPool:
+    """
+    Opens the connection pool for the specified database path. If the pool is already open, it is re-entered.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+        - cached_statements (int): The size of each connection's prepared statement cache.
+
+    Returns:
+        - ConnectionPool: The pool for the database path.
+    """
+    with _pools_lock:
+        pool = _pools.get(_pool_key(db_path))
+        if pool is None:
+            pool = ConnectionPool(db_path, cached_statements)
+            _pools[_pool_key(db_path)] = pool
+        pool.users += 1
+    return pool
+
+
+def close_pool(db_path: str) -> None:
+    """
+    Leaves the connection pool for the specified database path. The pool is closed once every user has left it.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+
+    Returns:
+        - None
+    """
+    with _pools_lock:
+        pool = _pools.get(_pool_key(db_path))
+        if pool is None:
+            return
+        pool.users -= 1
+        if pool.users > 0:
+            return
+        del _pools[_pool_key(db_path)]
+    pool.close()
+
+
+def get_pool(db_path: str) -> ConnectionPool | None:
+    """
+    Returns the open connection pool for the specified database path.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+
+    Returns:
+        - ConnectionPool | None: The pool, or None if no pool is open for the path.
+    """
+    return _pools.get(_pool_key(db_path))
+
+
+@contextmanager
+def pooled(db_path: str, cached_statements: int = DEFAULT_CACHED_STATEMENTS) -> Iterator[ConnectionPool]:
+    """
+    Keeps a connection pool open for the specified database path for the duration of a with-block.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+        - cached_statements (int): The size of each connection's prepared statement cache.
+
+    Returns:
+        - Iterator[ConnectionPool]: The open pool.
+    """
+    pool = open_pool(db_path, cached_statements)
+    try:
+        yield pool
+    finally:
+        close_pool(db_path)
+
+
+@contextmanager
+def connect(db_path: str) -> Iterator[tuple[sqlite3.Connection, sqlite3.Cursor]]:
+    """
+    Yields a connection and cursor for the specified database path and commits when the block finishes.
+
+    If a pool is open for the path, the calling thread's pooled connection is used and left open. Otherwise, a new
+    connection is opened with open_database and closed with close_database, as before pooling existed.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+
+    Returns:
+        - Iterator[tuple[sqlite3.Connection, sqlite3.Cursor]]: The connection and cursor.
+    """
+    pool = get_pool(db_path)
+    if pool is None:
+        conn, cursor = init_processing.open_database(db_path)
+        try:
+            yield conn, cursor
+        except BaseException:
+            conn.close()
+            raise
+        init_processing.close_database(conn)
+        return
+
+    conn, cursor = pool.acquire()
+    try:
+        yield conn, cursor
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def close_all_pools() -> None:
+    """
+    Closes every open connection pool, regardless of how many users it has.
+
+    Returns:
+        - None
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
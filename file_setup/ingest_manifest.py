@@ -0,0 +1,236 @@
+# file_setup\ingest_manifest.py
+"""
+This file contains functions for incremental ingestion of the essay directory.
+
+An ingest_manifest table records the path, modification time, size, and content hash of every essay file that has been
+ingested, along with the id of its row in the essays table. On later runs only files whose mtime or size changed are
+hashed, and only files whose hash changed are parsed, lemmatized, and upserted, so a run where nothing changed is a
+directory scan and one query.
+
+Functions include:
+
+    - create_manifest_table(conn: sqlite3.Connection) - Creates the ingest_manifest table if it doesn't exist.
+    - hash_file(file_path: str) - Returns the SHA-256 hash of a file's contents.
+    - find_changed_files(conn: sqlite3.Connection, essay_dir: str) - Returns the essay files that are new or have changed since they were last ingested.
+    - record_file(conn: sqlite3.Connection, changed_file: ChangedFile, essay_id: int | None) - Inserts or updates a file's manifest entry.
+    - upsert_essay(conn: sqlite3.Connection, table_name: str, essay_id: int | None, title: str, year: int, processed_content: str, full_text: str) - Updates or inserts an essay row.
+    - incremental_ingest(db_path: str, essay_dir: str, table_name: str) - Ingests new or changed essays and returns their row IDs.
+    - main() - Runs an incremental ingest of the dataset directory.
+"""
+
+import hashlib
+import os
+import sqlite3
+from typing import NamedTuple
+
+from file_setup import init_processing, lemma_cache
+from file_setup.config import essay_db_path, dataset_dir, lemma_cache_path
+
+MANIFEST_SCHEMA: str = """path TEXT PRIMARY KEY,
+                          mtime REAL NOT NULL,
+                          size INTEGER NOT NULL,
+                          content_hash TEXT NOT NULL,
+                          essay_id INTEGER"""
+
+class ChangedFile(NamedTuple):
+    """
+    An essay file that is new or has changed since it was last ingested.
+    """
+    file_name: str
+    path: str
+    mtime: float
+    size: int
+    content_hash: str
+    essay_id: int | None
+
+
+def create_manifest_table(conn: sqlite3.Connection) -> None:
+    """
+    Creates the ingest_manifest table if it doesn't exist.
+
+    Parameters:
+        - conn: The database connection object.
+
+    Returns:
+        - None
+    """
+    conn.execute(f"CREATE TABLE IF NOT EXISTS ingest_manifest ({MANIFEST_SCHEMA})")
+    conn.commit()
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Returns the SHA-256 hash of a file's contents.
+
+    Parameters:
+        - file_path (str): The path to the file.
+
+    Returns:
+        - str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_changed_files(conn: sqlite3.Connection, essay_dir: str) -> list[ChangedFile]:
+    """
+    Returns the .odt and .docx files in the directory that are new or have changed since they were last ingested.
+
+    Files whose mtime and size match the manifest are skipped without being read. Files whose mtime or size changed
+    but whose hash did not (e.g. a re-save without edits) only have their manifest entry refreshed.
+
+    Parameters:
+        - conn: The database connection object.
+        - essay_dir (str): The directory containing the essays.
+
+    Returns:
+        - list[ChangedFile]: The new or changed files, in directory order.
+    """
+    manifest: dict[str, tuple[float, int, str, int | None]] = {
+        path: (mtime, size, content_hash, essay_id)
+        for path, mtime, size, content_hash, essay_id in conn.execute(
+            "SELECT path, mtime, size, content_hash, essay_id FROM ingest_manifest")
+    }
+
+    changed: list[ChangedFile] = []
+    with os.scandir(essay_dir) as entries:
+        for entry in entries:
+            if not (entry.name.endswith('.odt') or entry.name.endswith('.docx')):
+                continue
+
+            path = os.path.abspath(entry.path)
+            stat = entry.stat()
+            known = manifest.get(path)
+            if known is not None and known[0] == stat.st_mtime and known[1] == stat.st_size:
+                continue
+
+            content_hash = hash_file(path)
+            changed_file = ChangedFile(entry.name, path, stat.st_mtime, stat.st_size, content_hash,
+                                       known[3] if known else None)
+            if known is not None and known[2] == content_hash:
+                record_file(conn, changed_file, changed_file.essay_id)
+                continue
+
+            changed.append(changed_file)
+
+    conn.commit()
+    return changed
+
+
+def record_file(conn: sqlite3.Connection, changed_file: ChangedFile, essay_id: int | None) -> None:
+    """
+    Inserts or updates a file's manifest entry. Does not commit.
+
+    Parameters:
+        - conn: The database connection object.
+        - changed_file (ChangedFile): The file to record.
+        - essay_id (int | None): The id of the file's row in the essays table.
+
+    Returns:
+        - None
+    """
+    conn.execute(
+        """INSERT INTO ingest_manifest (path, mtime, size, content_hash, essay_id) VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT(path) DO UPDATE SET mtime = excluded.mtime, size = excluded.size,
+                                           content_hash = excluded.content_hash, essay_id = excluded.essay_id""",
+        (changed_file.path, changed_file.mtime, changed_file.size, changed_file.content_hash, essay_id))
+
+
+def upsert_essay(conn: sqlite3.Connection, table_name: str, essay_id: int | None, title: str, year: int,
+                 processed_content: str, full_text: str) -> int:
+    """
+    Updates an essay row in place, or inserts it if there is no row to update. Does not commit.
+
+    The row is found by essay_id if given, otherwise by title, so databases built before the manifest existed are
+    adopted instead of getting duplicate rows.
+
+    Parameters:
+        - conn: The database connection object.
+        - table_name (str): The name of the essays table.
+        - essay_id (int | None): The id recorded in the manifest, if any.
+        - title (str): The title of the essay.
+        - year (int): The year of the essay.
+        - processed_content (str): The lemmatized content of the essay.
+        - full_text (str): The raw text of the essay.
+
+    Returns:
+        - int: The id of the updated or inserted row.
+    """
+    row = None
+    if essay_id is not None:
+        row = conn.execute(f"SELECT id FROM {table_name} WHERE id = ?", (essay_id,)).fetchone()
+    if row is None:
+        row = conn.execute(f"SELECT id FROM {table_name} WHERE title = ? ORDER BY id LIMIT 1", (title,)).fetchone()
+
+    if row is None:
+        cursor = conn.execute(f"INSERT INTO {table_name} (title, year, content, full_text) VALUES (?, ?, ?, ?)",
+                              (title, year, processed_content, full_text))
+        return cursor.lastrowid
+
+    conn.execute(f"UPDATE {table_name} SET title = ?, year = ?, content = ?, full_text = ? WHERE id = ?",
+                 (title, year, processed_content, full_text, row[0]))
+    return row[0]
+
+
+def incremental_ingest(db_path: str, essay_dir: str, table_name: str = 'essays') -> list[int]:
+    """
+    Ingests the essays in the directory that are new or have changed since the last run. The essays table,
+    its full_text column, and the manifest table are created if needed.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+        - essay_dir (str): The directory containing the essays.
+        - table_name (str): The name of the essays table. Default is 'essays'.
+
+    Returns:
+        - list[int]: The row IDs of the essays that were inserted or updated.
+    """
+    conn, cursor = init_processing.create_database(db_path, table_name, init_processing.ESSAY_SCHEMA)
+    try:
+        columns = [column[1] for column in cursor.execute(f"PRAGMA table_info({table_name})")]
+        if 'full_text' not in columns:
+            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN full_text TEXT")
+        create_manifest_table(conn)
+
+        changed = find_changed_files(conn, essay_dir)
+        if not changed:
+            return []
+
+        lemmatizer, stop_words = init_processing.setup_lemmatizer()
+        lemma_cache.default_cache.load(lemma_cache_path)
+        essay_ids: list[int] = []
+        for changed_file in changed:
+            title, year, full_text = init_processing.read_essay(essay_dir, changed_file.file_name)
+            processed_content = init_processing.process_content(full_text, lemmatizer, stop_words)
+            essay_id = upsert_essay(conn, table_name, changed_file.essay_id, title, year, processed_content,
+                                    full_text)
+            record_file(conn, changed_file, essay_id)
+            essay_ids.append(essay_id)
+        conn.commit()
+        lemma_cache.default_cache.save(lemma_cache_path)
+    finally:
+        init_processing.close_database(conn)
+
+    return essay_ids
+
+
+def main():
+    """
+    Runs an incremental ingest of the dataset directory into the essay database.
+
+    Parameters:
+        - None
+
+    Returns:
+        - None
+    """
+    print("Checking for new or changed essays...")
+    essay_ids = incremental_ingest(essay_db_path, dataset_dir)
+    print(f"Ingested {len(essay_ids)} new or changed essays.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+# file_setup\ingest_pipeline.py
+"""
+This file contains a streaming ingest pipeline from the essay directory to the database. It is the streaming
+counterpart of init_processing.main.
+
+Each stage runs in its own thread and hands items to the next stage through a bounded queue, so only a fixed number of
+essays are in memory at any time and the first batch reaches the database while later files are still being parsed:
+
+    discover (file names) -> extract (title, year, text) -> normalize (process_content) -> write (batched inserts)
+
+Functions include:
+
+    - run_pipeline(essay_dir: str, db_path: str, table_name: str, batch_size: int, queue_size: int, workers: int) - Streams the essays in a directory into the database.
+    - format_stage_stats(stats: dict[str, dict[str, float]]) - Formats the per-stage statistics as a table.
+    - main() - Streams the dataset directory into the essay database.
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+from file_setup import init_processing, lemma_cache
+from file_setup.config import essay_db_path, dataset_dir, lemma_cache_path
+
+# Marks the end of a stage's output.
+_DONE = object()
+
+
+class _Stage:
+    """
+    Bookkeeping for one pipeline stage: how many items it produced and how long it spent working rather than waiting
+    on its neighbours.
+    """
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.items: int = 0
+        self.busy_seconds: float = 0.0
+        self.started: float = 0.0
+        self.finished: float = 0.0
+
+    def stats(self) -> dict[str, float]:
+        wall_seconds = self.finished - self.started
+        return {
+            'items': self.items,
+            'busy_seconds': self.busy_seconds,
+            'wall_seconds': wall_seconds,
+            'items_per_busy_second': self.items / self.busy_seconds if self.busy_seconds else 0.0,
+            'items_per_wall_second': self.items / wall_seconds if wall_seconds else 0.0,
+        }
+
+
+def _put(target: queue.Queue, item: Any, stop: threading.Event) -> None:
+    # Block on a full queue, but give up if another stage failed, so upstream threads can't hang forever.
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+    raise InterruptedError("Pipeline stopped.")
+
+
+def _drain(source: queue.Queue, stop: threading.Event, waited: list[float]) -> Iterator[Any]:
+    # Yield items from a queue until the upstream stage is done, adding the time spent waiting to waited[0].
+    while True:
+        start = time.perf_counter()
+        while True:
+            if stop.is_set():
+                raise InterruptedError("Pipeline stopped.")
+            try:
+                item = source.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        waited[0] += time.perf_counter() - start
+        if item is _DONE:
+            return
+        yield item
+
+
+def _run_stage(stage: _Stage, produce: Callable[[list[float]], Iterable[Any]], output: queue.Queue,
+               stop: threading.Event, errors: list[BaseException]) -> None:
+    # Run one stage: pull items from produce() and push them downstream, timing everything but queue waits.
+    waited: list[float] = [0.0]
+    stage.started = time.perf_counter()
+    try:
+        items = iter(produce(waited))
+        while True:
+            start = time.perf_counter()
+            waited_before = waited[0]
+            try:
+                item = next(items)
+            except StopIteration:
+                break
+            stage.busy_seconds += time.perf_counter() - start - (waited[0] - waited_before)
+            stage.items += 1
+            _put(output, item, stop)
+        _put(output, _DONE, stop)
+    except BaseException as e:
+        if not isinstance(e, InterruptedError):
+            errors.append(e)
+        stop.set()
+    finally:
+        stage.finished = time.perf_counter()
+
+
+def run_pipeline(essay_dir: str, db_path: str = essay_db_path, table_name: str = 'essays', batch_size: int = 200,
+                 queue_size: int = 64, workers: int = 1) -> tuple[dict[str, dict[str, float]], list[tuple[int, str]]]:
+    """
+    Streams the .odt and .docx files in a directory into the database: discover, extract, normalize, and write in
+    batches, each stage in its own thread with bounded queues between them.
+
+    Parameters:
+        - essay_dir (str): The directory containing the essays.
+        - db_path (str): The path to the database file. The table is created if needed.
+        - table_name (str): The name of the table to insert into. Default is 'essays'.
+        - batch_size (int): The number of rows written per transaction. Default is 200.
+        - queue_size (int): The maximum number of items waiting between two stages. Default is 64.
+        - workers (int): The number of processes used to parse files. Default is 1.
+
+    Raises:
+        Exception: The first error raised by any stage, after every stage has stopped.
+
+    Returns:
+        - dict[str, dict[str, float]]: Per-stage statistics (items, busy and wall seconds, and throughput).
+        - list[tuple[int, str]]: The index and error message of every row that could not be inserted.
+    """
+    lemmatizer, stop_words = init_processing.setup_lemmatizer()
+    lemma_cache.default_cache.load(lemma_cache_path)
+
+    stop = threading.Event()
+    errors: list[BaseException] = []
+    file_names: queue.Queue = queue.Queue(maxsize=queue_size)
+    documents: queue.Queue = queue.Queue(maxsize=queue_size)
+    rows: queue.Queue = queue.Queue(maxsize=queue_size)
+    stages = {name: _Stage(name) for name in ('discover', 'extract', 'normalize', 'write')}
+
+    def discover(waited: list[float]) -> Iterator[str]:
+        with os.scandir(essay_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.odt') or entry.name.endswith('.docx'):
+                    yield entry.name
+
+    def extract(waited: list[float]) -> Iterator[tuple[str, int, str]]:
+        return init_processing.iter_file_content(essay_dir, workers, _drain(file_names, stop, waited))
+
+    def normalize(waited: list[float]) -> Iterator[tuple[str, int, str]]:
+        for title, year, content in _drain(documents, stop, waited):
+            yield title, year, init_processing.process_content(content, lemmatizer, stop_words)
+
+    threads = [
+        threading.Thread(target=_run_stage, args=(stages['discover'], discover, file_names, stop, errors)),
+        threading.Thread(target=_run_stage, args=(stages['extract'], extract, documents, stop, errors)),
+        threading.Thread(target=_run_stage, args=(stages['normalize'], normalize, rows, stop, errors)),
+    ]
+    for thread in threads:
+        thread.start()
+
+    insert_errors: list[tuple[int, str]] = []
+    write = stages['write']
+    conn, cursor = init_processing.create_database(db_path, table_name, init_processing.ESSAY_SCHEMA)
+    write.started = time.perf_counter()
+    try:
+        waited: list[float] = [0.0]
+        batch: list[tuple[str, int, str]] = []
+        for row in _drain(rows, stop, waited):
+            batch.append(row)
+            if len(batch) < batch_size:
+                continue
+            insert_errors.extend(_write_batch(write, batch, conn, table_name))
+            batch = []
+        if batch:
+            insert_errors.extend(_write_batch(write, batch, conn, table_name))
+    except BaseException as e:
+        if not isinstance(e, InterruptedError):
+            errors.append(e)
+        stop.set()
+    finally:
+        write.finished = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        init_processing.close_database(conn)
+
+    if errors:
+        raise errors[0]
+
+    lemma_cache.default_cache.save(lemma_cache_path)
+    return {name: stage.stats() for name, stage in stages.items()}, insert_errors
+
+
+def _write_batch(stage: _Stage, batch: list[tuple[str, int, str]], conn, table_name: str) -> list[tuple[int, str]]:
+    # Insert one batch in its own transaction and shift the returned row indexes to pipeline-wide indexes.
+    start = time.perf_counter()
+    batch_errors = init_processing.bulk_insert_into_database(batch, conn, table_name, chunk_size=len(batch))
+    stage.busy_seconds += time.perf_counter() - start
+    offset = stage.items
+    stage.items += len(batch)
+    return [(offset + index, message) for index, message in batch_errors]
+
+
+def format_stage_stats(stats: dict[str, dict[str, float]]) -> str:
+    """
+    Formats the per-stage statistics returned by run_pipeline as a table.
+
+    Parameters:
+        - stats (dict[str, dict[str, float]]): The statistics.
+
+    Returns:
+        - str: The table.
+    """
+    lines = [f"{'Stage':<12}{'Items':>8}{'Busy (s)':>10}{'Wall (s)':>10}{'Items/busy s':>14}"]
+    for name, stage in stats.items():
+        lines.append(f"{name:<12}{stage['items']:>8}{stage['busy_seconds']:>10.3f}{stage['wall_seconds']:>10.3f}"
+                     f"{stage['items_per_busy_second']:>14.1f}")
+    return '\n'.join(lines)
+
+
+def main():
+    """
+    Streams the dataset directory into the essay database and prints the per-stage throughput.
+
+    Parameters:
+        - None
+
+    Returns:
+        - None
+    """
+    print("Streaming essays into the database...")
+    stats, insert_errors = run_pipeline(dataset_dir, essay_db_path, workers=max(1, (os.cpu_count() or 2) - 1))
+    for index, message in insert_errors:
+        print(f"Row {index} was not inserted: {message}")
+    print(format_stage_stats(stats))
+
+
+if __name__ == '__main__':
+    main()
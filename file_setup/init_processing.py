@@ -7,10 +7,15 @@ Functions include:
     - create_database(db_path: str, table_name: str, schema: str) - Creates a database connection and a cursor to the specified database path.
     - open_database(db_path: str) - Opens a database connection and a cursor to the specified database path.
     - setup_lemmatizer() - Sets up the lemmatizer and stop words.
-    - process_content(content: str, lemmatizer: Any, stop_words: set[str]) - Processes the specified content using the specified lemmatizer and stop words.
+    - process_content(content: str, lemmatizer: Any, stop_words: set[str], cache: LemmaCache) - Processes the specified content using the specified lemmatizer and stop words.
     - return_title_and_year(filename: str, filepath: str) - Returns the title and year of the specified file.
-    - read_file_content(essay_dir: str) - Reads the content of all .odt and .docx files in the specified directory.
+    - extract_text(file_path: str) - Extracts the text of a single .odt or .docx file.
+    - read_essay(essay_dir: str, file_name: str) - Reads the title, year, and content of a single essay.
+    - list_essay_files(essay_dir: str) - Lists the .odt and .docx files in the specified directory.
+    - iter_file_content(essay_dir: str, workers: int, file_names: Iterable[str]) - Yields the title, year, and content of each essay, optionally parsed in a process pool.
+    - read_file_content(essay_dir: str, workers: int) - Reads the content of all .odt and .docx files in the specified directory.
     - insert_into_database(db_path: str, table_name: str, column_name: str, data: Any) - Inserts data into the specified table in the database.
+    - bulk_insert_into_database(data: Iterable[tuple], conn: sqlite3.Connection, table_name: str, column_names: Sequence[str], chunk_size: int, fast_load: bool) - Inserts data in chunks inside a single transaction.
     - close_database(conn: sqlite3.Connection) - Closes a database connection.
     - main() - Main function to initialize the processing of the data.
 """
@@ -18,15 +23,25 @@ Functions include:
 import os
 import sqlite3
 import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
 import docx
-import nltk
-from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from nltk.tokenize import word_tokenize
 from odf import teletype, text as odf_text
 from odf.opendocument import load
 
-from file_setup.config import essay_db_path, dataset_dir
+from file_setup import lemma_cache, nlp_resources
+from file_setup.config import essay_db_path, dataset_dir, lemma_cache_path
+from file_setup.lemma_cache import LemmaCache
+
+ESSAY_SCHEMA: str = """id INTEGER PRIMARY KEY,
+                       title TEXT,
+                       year INTEGER,
+                       content TEXT"""
 
 
 def create_database(db_path: str, table_name: str, schema: str) -> tuple[sqlite3.Connection, sqlite3.Cursor]:
@@ -68,8 +83,8 @@ def open_database(db_path: str) -> tuple[sqlite3.Connection, sqlite3.Cursor]:
 
 def setup_lemmatizer() -> tuple[WordNetLemmatizer, set[str]]:
     """
-    Set up the lemmatizer by downloading necessary NLTK resources and initializing 
-    the lemmatizer, stop words, and essay directory.
+    Set up the lemmatizer and stop words. NLTK resources are only downloaded if they are not already installed,
+    and the lemmatizer and stop words are shared through file_setup.nlp_resources.
 
     Parameters:
         - None
@@ -78,31 +93,42 @@ def setup_lemmatizer() -> tuple[WordNetLemmatizer, set[str]]:
         - lemmatizer: the initialized WordNetLemmatizer
         - stop_words: a set of English stop words
     """
-    nltk.download('stopwords')
-    nltk.download('punkt')
-    nltk.download('wordnet')
+    nlp_resources.ensure_nltk_resources(('stopwords', 'punkt', 'punkt_tab', 'wordnet'))
 
-    lemmatizer = WordNetLemmatizer()
-    stop_words = set(stopwords.words('english'))
+    lemmatizer = nlp_resources.get_lemmatizer()
+    stop_words = set(nlp_resources.get_stop_words())
 
     return lemmatizer, stop_words
 
 
-def process_content(content: str, lemmatizer: WordNetLemmatizer, stop_words: set[str]) -> str:
+def process_content(content: str, lemmatizer: WordNetLemmatizer, stop_words: set[str],
+                    cache: LemmaCache | None = None) -> str:
     """
         Process the content by tokenizing, converting to lowercase, lemmatizing, and removing stop words.
 
+        Filtering happens in a single pass over the tokens, and lemmas are memoized in an LRU cache.
+
         Parameters:
             - content (str): The input content to be processed.
             - lemmatizer: The lemmatizer object.
             - stop_words: A set of English stop words.
+            - cache (LemmaCache | None): The lemma cache to use. Defaults to lemma_cache.default_cache.
 
         Returns:
             - str: The processed content.
         """
-    words = word_tokenize(content)
-    words = [word.lower() for word in words if word.isalpha()]
-    words = [lemmatizer.lemmatize(word) for word in words if word not in stop_words]
+    if cache is None:
+        cache = lemma_cache.default_cache
+
+    words: list[str] = []
+    for word in word_tokenize(content):
+        if not word.isalpha():
+            continue
+        word = word.lower()
+        if word in stop_words:
+            continue
+        words.append(cache.lemmatize(word, lemmatizer))
+
     processed_content = " ".join(words)
     return processed_content
 
@@ -125,36 +151,108 @@ def return_title_and_year(file_name: str, file_path: str) -> tuple[str, int]:
     return title, year
 
 
-def read_file_content(essay_dir: str) -> list[tuple[str, int, str]]:
+def extract_text(file_path: str) -> str:
     """
-    Reads the content of all .odt and .docx files in the specified directory.
+    Extracts the text of a single .odt or .docx file.
+
+    Parameters:
+        - file_path (str): The path to the file.
+
+    Returns:
+        - str: The paragraphs of the file joined by spaces, or an empty string for other file types.
+    """
+    content = ""
+    if file_path.endswith('.odt'):
+        odt_file = load(file_path)
+        all_text = odt_file.getElementsByType(odf_text.P)
+        content = " ".join([teletype.extractText(text) for text in all_text])
+    elif file_path.endswith('.docx'):
+        doc = docx.Document(file_path)
+        content = " ".join([para.text for para in doc.paragraphs])
+
+    return content
+
+
+def read_essay(essay_dir: str, file_name: str) -> tuple[str, int, str]:
+    """
+    Reads the title, year, and content of a single essay. Kept at module level so worker processes can run it.
+
+    Parameters:
+        - essay_dir (str): The directory containing the essay.
+        - file_name (str): The name of the essay file.
+
+    Returns:
+        - tuple[str, int, str]: The title, year, and content of the file.
+    """
+    file_path = os.path.join(essay_dir, file_name)
+    title, year = return_title_and_year(file_name, file_path)
+    return title, year, extract_text(file_path)
+
+
+def list_essay_files(essay_dir: str) -> list[str]:
+    """
+    Lists the .odt and .docx files in the specified directory.
 
     Parameters:
         - essay_dir (str): The directory containing the essays.
 
     Returns:
-        - list[tuple[str, int, str]]: A list of tuples, each containing the title, year, and content of the file.
+        - list[str]: The file names, in directory order.
     """
-    file_contents: list[tuple[str, int, str]] = []
+    return [file_name for file_name in os.listdir(essay_dir)
+            if file_name.endswith('.odt') or file_name.endswith('.docx')]
 
-    for filename in os.listdir(essay_dir):
-        if filename.endswith('.odt') or filename.endswith('.docx'):
-            filepath = os.path.join(essay_dir, filename)
 
-            title, year = return_title_and_year(filename, filepath)
+def iter_file_content(essay_dir: str, workers: int = 1,
+                      file_names: Iterable[str] | None = None) -> Iterator[tuple[str, int, str]]:
+    """
+    Yields the title, year, and content of each .odt and .docx file in the specified directory, in directory order.
 
-            content = ""
-            if filename.endswith('.odt'):
-                odt_file = load(filepath)
-                all_text = odt_file.getElementsByType(odf_text.P)
-                content = " ".join([teletype.extractText(text) for text in all_text])
-            elif filename.endswith('.docx'):
-                doc = docx.Document(filepath)
-                content = " ".join([para.text for para in doc.paragraphs])
+    With more than one worker, files are parsed in a process pool. At most two files per worker are in flight at a
+    time, so the caller can start using results before the whole directory has been parsed.
 
-            file_contents.append((title, year, content))
+    Parameters:
+        - essay_dir (str): The directory containing the essays.
+        - workers (int): The number of worker processes. 1 parses in the calling process. Default is 1.
+        - file_names (Iterable[str] | None): The files to read. Defaults to list_essay_files(essay_dir).
 
-    return file_contents
+    Returns:
+        - Iterator[tuple[str, int, str]]: Tuples of title, year, and content.
+    """
+    if file_names is None:
+        file_names = list_essay_files(essay_dir)
+
+    if workers <= 1:
+        for file_name in file_names:
+            yield read_essay(essay_dir, file_name)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque[Future] = deque()
+        try:
+            for file_name in file_names:
+                pending.append(executor.submit(read_essay, essay_dir, file_name))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def read_file_content(essay_dir: str, workers: int = 1) -> list[tuple[str, int, str]]:
+    """
+    Reads the content of all .odt and .docx files in the specified directory.
+
+    Parameters:
+        - essay_dir (str): The directory containing the essays.
+        - workers (int): The number of worker processes to parse files with. Default is 1.
+
+    Returns:
+        - list[tuple[str, int, str]]: A list of tuples, each containing the title, year, and content of the file.
+    """
+    return list(iter_file_content(essay_dir, workers))
 
 
 def insert_into_database(data: list[tuple[str, int, str]], conn: sqlite3.Connection, cursor: sqlite3.Cursor,
@@ -191,6 +289,79 @@ def insert_into_database(data: list[tuple[str, int, str]], conn: sqlite3.Connect
         print(f"An error occurred: {e}")
 
 
+def bulk_insert_into_database(data: Iterable[tuple], conn: sqlite3.Connection, table_name: str,
+                              column_names: Sequence[str] = ('title', 'year', 'content'), chunk_size: int = 500,
+                              fast_load: bool = False) -> list[tuple[int, str]]:
+    """
+    Insert data into the specified table in chunks with executemany, committing once at the end.
+
+    Each chunk runs under a savepoint. If a chunk fails, it is rolled back and retried row by row so that only the bad
+    rows are skipped, and their errors are returned instead of printed.
+
+    Parameters:
+        - data (Iterable[tuple]): The rows to insert, in the same order as column_names. May be a generator.
+        - conn: The database connection object.
+        - table_name (str): The name of the table to insert data into.
+        - column_names (Sequence[str]): The columns to insert into. Default is title, year and content.
+        - chunk_size (int): The number of rows passed to each executemany call. Default is 500.
+        - fast_load (bool): Whether to switch to WAL mode with synchronous=OFF for the load. The previous settings are
+          restored afterwards. Default is False.
+
+    Returns:
+        - list[tuple[int, str]]: The index (within data) and error message of every row that could not be inserted.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+
+    placeholders = ', '.join(['?'] * len(column_names))
+    columns = ', '.join(column_names)
+    query = f'INSERT INTO {table_name} ({columns}) VALUES ({placeholders})'
+    errors: list[tuple[int, str]] = []
+
+    if conn.in_transaction:
+        conn.commit()
+
+    previous_journal_mode: str | None = None
+    previous_synchronous: int | None = None
+    if fast_load:
+        previous_journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        previous_synchronous = conn.execute('PRAGMA synchronous').fetchone()[0]
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=OFF')
+
+    rows = iter(data)
+    start = 0
+    try:
+        conn.execute('BEGIN')
+        while chunk := list(islice(rows, chunk_size)):
+            conn.execute('SAVEPOINT bulk_chunk')
+            try:
+                conn.executemany(query, chunk)
+            except sqlite3.Error:
+                conn.execute('ROLLBACK TO bulk_chunk')
+                for offset, row in enumerate(chunk):
+                    try:
+                        conn.execute(query, row)
+                    except sqlite3.Error as e:
+                        errors.append((start + offset, str(e)))
+            conn.execute('RELEASE bulk_chunk')
+            start += len(chunk)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        if fast_load:
+            conn.execute(f'PRAGMA synchronous={previous_synchronous}')
+            try:
+                conn.execute(f'PRAGMA journal_mode={previous_journal_mode}')
+            except sqlite3.OperationalError:
+                # Leaving WAL needs exclusive access; if another connection is open the database simply stays in WAL.
+                pass
+
+    return errors
+
+
 def close_database(conn: sqlite3.Connection) -> None:
     """
     Closes the database connection.
@@ -224,16 +395,13 @@ def main():
 
     if not os.path.exists(essay_db_path):
         print("Database directory not found. Creating new database...")
-        schema = """id INTEGER PRIMARY KEY,
-                    title TEXT,
-                    year INTEGER,
-                    content TEXT"""
-        conn, cursor = create_database(essay_db_path, 'essays', schema)
+        conn, cursor = create_database(essay_db_path, 'essays', ESSAY_SCHEMA)
     else:
         print("Database directory found. Using existing database...")
         conn, cursor = open_database(essay_db_path)
 
     lemmatizer, stop_words = setup_lemmatizer()
+    lemma_cache.default_cache.load(lemma_cache_path)
 
     file_contents = read_file_content(dataset_dir)
     processed_data = [(title, year, process_content(content, lemmatizer, stop_words)) for title, year, content in
@@ -241,6 +409,8 @@ def main():
     insert_into_database(processed_data, conn, cursor, 'essays', print_output=True)
 
     close_database(conn)
+    lemma_cache.default_cache.save(lemma_cache_path)
+    print("Lemma cache:", lemma_cache.default_cache.stats())
     print("Data initialization complete.")
 
 
@@ -0,0 +1,140 @@
+# file_setup\lemma_cache.py
+"""
+This file contains a bounded LRU cache of lemmas for init_processing.process_content.
+
+Essays reuse the same vocabulary heavily, so most lemmatizer calls repeat earlier work. The cache maps lowercase words
+to their lemmas, keeps the most recently used entries up to a maximum size, counts hits and misses so the size can be
+tuned, and can be saved to disk so later runs start warm.
+
+The cache assumes every word is lemmatized by the same kind of lemmatizer (WordNet, in this project).
+
+Classes include:
+
+    - LemmaCache(maxsize: int) - A bounded LRU cache of word -> lemma.
+
+Variables:
+
+    - default_cache: The cache process_content uses when none is given.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from typing import Any
+
+
+class LemmaCache:
+    """
+    A bounded LRU cache of word -> lemma with hit and miss counters.
+
+    Parameters:
+        - maxsize (int): The maximum number of words to keep. Default is 100,000.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lemmas: OrderedDict[str, str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._lemmas)
+
+    def lemmatize(self, word: str, lemmatizer: Any) -> str:
+        """
+        Returns the lemma of the word, calling the lemmatizer only if the word is not cached.
+
+        Parameters:
+            - word (str): The lowercase word.
+            - lemmatizer: The lemmatizer object, used on a miss.
+
+        Returns:
+            - str: The lemma.
+        """
+        lemma = self._lemmas.get(word)
+        if lemma is not None:
+            self.hits += 1
+            self._lemmas.move_to_end(word)
+            return lemma
+
+        self.misses += 1
+        lemma = lemmatizer.lemmatize(word)
+        self._lemmas[word] = lemma
+        if len(self._lemmas) > self.maxsize:
+            self._lemmas.popitem(last=False)
+        return lemma
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The fraction of lookups that were hits, or 0.0 before any lookup.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            - dict[str, int | float]: The hits, misses, hit rate, current size, and maximum size.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate, 'size': len(self._lemmas),
+                'maxsize': self.maxsize}
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the counters.
+        """
+        self._lemmas.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, path: str) -> bool:
+        """
+        Saves the entries to a JSON file, least recently used first. Nothing is written if the file's directory
+        doesn't exist.
+
+        Parameters:
+            - path (str): The path to the JSON file.
+
+        Returns:
+            - bool: True if the file was written, False otherwise.
+        """
+        directory = os.path.dirname(path)
+        if not directory or not os.path.isdir(directory):
+            return False
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(list(self._lemmas.items()), f)
+        os.replace(temp_path, path)
+        return True
+
+    def load(self, path: str) -> int:
+        """
+        Loads entries from a JSON file written by save. Entries beyond maxsize are dropped, oldest first.
+
+        Parameters:
+            - path (str): The path to the JSON file.
+
+        Returns:
+            - int: The number of entries loaded, 0 if the file doesn't exist.
+        """
+        if not os.path.isfile(path):
+            return 0
+
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+
+        for word, lemma in entries[-self.maxsize:]:
+            self._lemmas[word] = lemma
+            self._lemmas.move_to_end(word)
+        while len(self._lemmas) > self.maxsize:
+            self._lemmas.popitem(last=False)
+        return min(len(entries), self.maxsize)
+
+
+default_cache: LemmaCache = LemmaCache()
@@ -0,0 +1,184 @@
+# file_setup\nlp_resources.py
+"""
+This file contains a process-wide registry of NLP models and resources.
+
+The spaCy pipeline, the NLTK stop words, and the WordNet lemmatizer are each loaded once per process and shared by
+every caller. NLTK data is looked up on disk first and is only downloaded if it is missing.
+
+Functions include:
+
+    - nltk_resource_available(name: str) - Checks whether an NLTK resource is installed, without touching the network.
+    - ensure_nltk_resources(names: Iterable[str], download: bool) - Makes sure the specified NLTK resources are installed.
+    - get_stop_words() - Returns the English stop words.
+    - get_lemmatizer() - Returns the shared WordNet lemmatizer.
+    - get_spacy_model(name: str, disable: Iterable[str]) - Returns the shared spaCy pipeline with the specified name.
+    - preload(spacy_models: Iterable[str], nltk_resources: Iterable[str]) - Loads models and resources up front, e.g. at startup.
+    - clear() - Forgets every loaded model and resource.
+"""
+
+import threading
+from typing import Any, Iterable
+
+import nltk
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+
+# NLTK resource names mapped to their paths in the NLTK data directory. punkt_tab is what word_tokenize and
+# sent_tokenize load in NLTK 3.8.2 and later; punkt is kept for older versions.
+NLTK_RESOURCES: dict[str, str] = {
+    'stopwords': 'corpora/stopwords',
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'wordnet': 'corpora/wordnet',
+}
+
+DEFAULT_SPACY_MODEL: str = 'en_core_web_sm'
+
+_lock = threading.RLock()
+_available_nltk_resources: set[str] = set()
+_stop_words: frozenset[str] | None = None
+_lemmatizer: WordNetLemmatizer | None = None
+_spacy_models: dict[tuple[str, tuple[str, ...]], Any] = {}
+
+
+def nltk_resource_available(name: str) -> bool:
+    """
+    Checks whether an NLTK resource is installed in one of the NLTK data directories. Never downloads anything.
+
+    Parameters:
+        - name (str): The name of the resource, e.g. 'stopwords'.
+
+    Returns:
+        - bool: True if the resource is installed, False otherwise.
+    """
+    if name in _available_nltk_resources:
+        return True
+
+    path = NLTK_RESOURCES.get(name, name)
+    # Some corpora (e.g. wordnet) are installed as zip files that NLTK reads without unpacking.
+    for candidate in (path, f"{path}.zip"):
+        try:
+            nltk.data.find(candidate)
+        except LookupError:
+            continue
+        _available_nltk_resources.add(name)
+        return True
+
+    return False
+
+
+def ensure_nltk_resources(names: Iterable[str] = ('stopwords', 'punkt', 'punkt_tab', 'wordnet'),
+                          download: bool = True) -> bool:
+    """
+    Makes sure the specified NLTK resources are installed, downloading only the ones that are missing.
+
+    Parameters:
+        - names (Iterable[str]): The names of the resources.
+        - download (bool): Whether missing resources may be downloaded. Default is True.
+
+    Returns:
+        - bool: True if every resource is installed afterwards, False otherwise.
+    """
+    all_available = True
+    with _lock:
+        for name in names:
+            if nltk_resource_available(name):
+                continue
+            if download:
+                nltk.download(name, quiet=True)
+                if nltk_resource_available(name):
+                    continue
+            all_available = False
+
+    return all_available
+
+
+def get_stop_words() -> frozenset[str]:
+    """
+    Returns the English stop words, loading them on first use.
+
+    Returns:
+        - frozenset[str]: The stop words.
+    """
+    global _stop_words
+    if _stop_words is None:
+        with _lock:
+            if _stop_words is None:
+                ensure_nltk_resources(('stopwords',))
+                _stop_words = frozenset(stopwords.words('english'))
+    return _stop_words
+
+
+def get_lemmatizer() -> WordNetLemmatizer:
+    """
+    Returns the shared WordNet lemmatizer, creating it on first use.
+
+    Returns:
+        - WordNetLemmatizer: The lemmatizer.
+    """
+    global _lemmatizer
+    if _lemmatizer is None:
+        with _lock:
+            if _lemmatizer is None:
+                ensure_nltk_resources(('wordnet',))
+                _lemmatizer = WordNetLemmatizer()
+    return _lemmatizer
+
+
+def get_spacy_model(name: str = DEFAULT_SPACY_MODEL, disable: Iterable[str] = ()) -> Any:
+    """
+    Returns the shared spaCy pipeline with the specified name, loading it on first use.
+
+    Parameters:
+        - name (str): The name of the spaCy model. Default is 'en_core_web_sm'.
+        - disable (Iterable[str]): Pipeline components to disable. Each combination is loaded once.
+
+    Returns:
+        - spacy.language.Language: The loaded pipeline.
+    """
+    key = (name, tuple(sorted(disable)))
+    nlp = _spacy_models.get(key)
+    if nlp is None:
+        with _lock:
+            nlp = _spacy_models.get(key)
+            if nlp is None:
+                # Imported here so that code which only needs NLTK doesn't pay for importing spaCy.
+                import spacy
+
+                nlp = spacy.load(name, disable=list(key[1]))
+                _spacy_models[key] = nlp
+    return nlp
+
+
+def preload(spacy_models: Iterable[str] = (DEFAULT_SPACY_MODEL,),
+            nltk_resources: Iterable[str] = ('stopwords', 'punkt', 'punkt_tab', 'wordnet')) -> None:
+    """
+    Loads the specified models and resources up front, so the first request or essay doesn't pay for them.
+
+    Parameters:
+        - spacy_models (Iterable[str]): The spaCy models to load.
+        - nltk_resources (Iterable[str]): The NLTK resources to check for (and download if missing).
+
+    Returns:
+        - None
+    """
+    ensure_nltk_resources(nltk_resources)
+    get_stop_words()
+    get_lemmatizer()
+    for name in spacy_models:
+        get_spacy_model(name)
+
+
+def clear() -> None:
+    """
+    Forgets every loaded model and resource, so the next call loads them again.
+
+    Returns:
+        - None
+    """
+    global _stop_words, _lemmatizer
+    with _lock:
+        _available_nltk_resources.clear()
+        _stop_words = None
+        _lemmatizer = None
+        _spacy_models.clear()
@@ -0,0 +1,9 @@
+"""
+Functions in this module are used by the chatbot to answer questions.
+
+Files:
+
+    - Chatbot.py: Examples of the NLTK and scikit-learn text processing the chatbot builds on.
+    - inverted_index.py: BM25 inverted index over the lemmatized essay content, for retrieving essays.
+    - embedding_index.py: Dense embedding index over essay summaries and passages, stored as memory-mapped vectors.
+"""
@@ -0,0 +1,550 @@
+# src\model\embedding_index.py
+"""
+This file contains a dense embedding index over the essay summaries and passages, used by the chatbot to find the
+essays and passages closest in meaning to a free-form question.
+
+Every essay contributes one item for its summary and one item per passage of its full text (whole sentences packed up
+to CHUNK_WORDS words). Items are embedded with spaCy document vectors when a spaCy pipeline is installed, or else with a
+TF-IDF + truncated SVD model fitted on the essays. Vectors are L2-normalized, so cosine similarity is a dot product.
+
+The vectors live in a raw float32 file next to essays.db that is memory-mapped on load and only ever appended to, so
+adding essays writes just their new rows. A JSON sidecar holds the encoder settings and, for every row, the essay id,
+item kind, and character span of the text it embeds. Re-embedded essays leave their old rows behind as deleted rows,
+which are dropped the next time the index is rebuilt.
+
+Search is exact (a blocked matrix product with top-k selection) by default. For large corpora build_ivf clusters the
+vectors with k-means so that a search with nprobe only scores the rows in the nprobe closest clusters.
+
+Classes include:
+
+    - SpacyEncoder(model_name: str) - Embeds texts with a spaCy pipeline's document vectors.
+    - TfidfSvdEncoder(dimensions: int) - Embeds texts with a TF-IDF model reduced by truncated SVD.
+    - EmbeddingIndex - A memory-mapped store of item vectors with exact and approximate cosine search.
+
+Functions include:
+
+    - chunk_text(text: str, max_words: int) - Splits text into passages of whole sentences and returns their spans.
+    - make_encoder(texts: list[str], model_names: Iterable[str]) - Returns a spaCy encoder if a model is installed, else a fitted TF-IDF + SVD encoder.
+    - build_embedding_index(db_path: str, index_path: str, table_name: str, encoder: Any) - Embeds every essay and saves a new index.
+    - load_embedding_index(index_path: str) - Loads a saved index, memory-mapping its vectors.
+    - update_embedding_index(db_path: str, essay_ids: list[int], index_path: str, table_name: str) - Re-embeds the given essays in a saved index, if there is one.
+    - main() - Rebuilds the embedding index of the essay database.
+"""
+
+import json
+import os
+import pickle
+import re
+import sys
+import time
+from typing import Any, Iterable
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from file_setup import connection_pool, nlp_resources
+from file_setup.config import essay_db_path, embedding_index_path
+
+# The largest number of words packed into one passage.
+CHUNK_WORDS: int = 120
+# The number of rows scored per matrix product during exact search, which bounds its memory use.
+SEARCH_BLOCK_ROWS: int = 65_536
+# spaCy pipelines to try, best vectors first. Only the tokenizer and tok2vec are needed for document vectors.
+SPACY_MODELS: tuple[str, ...] = ('en_core_web_md', 'en_core_web_sm')
+SPACY_UNUSED_COMPONENTS: tuple[str, ...] = ('tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'ner', 'senter')
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+class SpacyEncoder:
+    """
+    Embeds texts with a spaCy pipeline's document vectors.
+
+    Parameters:
+        - model_name (str): The name of the spaCy model.
+    """
+
+    kind: str = 'spacy'
+
+    def __init__(self, model_name: str):
+        self.model_name: str = model_name
+        self.nlp = nlp_resources.get_spacy_model(model_name, disable=SPACY_UNUSED_COMPONENTS)
+
+    def encode(self, texts: list[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Embeds texts.
+
+        Parameters:
+            - texts (list[str]): The texts.
+            - batch_size (int): The number of texts per spaCy batch. Default is 64.
+
+        Returns:
+            - np.ndarray: One float32 row per text.
+        """
+        vectors = [doc.vector for doc in self.nlp.pipe(texts, batch_size=batch_size)]
+        if not vectors:
+            return np.zeros((0, self.nlp.vocab.vectors_length), dtype=np.float32)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class TfidfSvdEncoder:
+    """
+    Embeds texts with a TF-IDF model reduced to a few hundred dimensions by truncated SVD (latent semantic analysis).
+
+    Parameters:
+        - dimensions (int): The largest number of dimensions. Default is 256.
+    """
+
+    kind: str = 'tfidf_svd'
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions: int = dimensions
+        self.vectorizer: TfidfVectorizer | None = None
+        self.svd: TruncatedSVD | None = None
+
+    def fit(self, texts: list[str]) -> 'TfidfSvdEncoder':
+        """
+        Fits the TF-IDF model and the SVD on a corpus.
+
+        Parameters:
+            - texts (list[str]): The corpus.
+
+        Returns:
+            - TfidfSvdEncoder: The encoder itself.
+        """
+        self.vectorizer = TfidfVectorizer(stop_words='english', sublinear_tf=True)
+        matrix = self.vectorizer.fit_transform(texts)
+        components = max(1, min(self.dimensions, matrix.shape[0] - 1, matrix.shape[1] - 1))
+        self.svd = TruncatedSVD(n_components=components, random_state=0)
+        self.svd.fit(matrix)
+        return self
+
+    def encode(self, texts: list[str], batch_size: int = 1024) -> np.ndarray:
+        """
+        Embeds texts.
+
+        Parameters:
+            - texts (list[str]): The texts.
+            - batch_size (int): Unused, kept for the same signature as SpacyEncoder.encode.
+
+        Raises:
+            RuntimeError: If the encoder has not been fitted.
+
+        Returns:
+            - np.ndarray: One float32 row per text.
+        """
+        if self.vectorizer is None or self.svd is None:
+            raise RuntimeError("The encoder must be fitted before it can encode.")
+        return self.svd.transform(self.vectorizer.transform(texts)).astype(np.float32)
+
+
+def chunk_text(text: str, max_words: int = CHUNK_WORDS) -> list[tuple[int, int]]:
+    """
+    Splits text into passages of whole sentences with at most max_words words each (a single longer sentence is its
+    own passage).
+
+    Parameters:
+        - text (str): The text.
+        - max_words (int): The largest number of words per passage. Default is CHUNK_WORDS.
+
+    Returns:
+        - list[tuple[int, int]]: The start and end character offsets of each passage.
+    """
+    spans: list[tuple[int, int]] = []
+    start = end = words = 0
+    position = 0
+    for match in [*_SENTENCE_END.finditer(text), None]:
+        sentence_end = match.start() if match else len(text)
+        sentence_words = len(text[position:sentence_end].split())
+        if sentence_words:
+            if words and words + sentence_words > max_words:
+                spans.append((start, end))
+                words = 0
+            if not words:
+                start = position
+            end = sentence_end
+            words += sentence_words
+        position = match.end() if match else len(text)
+
+    if words:
+        spans.append((start, end))
+    return spans
+
+
+def make_encoder(texts: list[str], model_names: Iterable[str] = SPACY_MODELS) -> SpacyEncoder | TfidfSvdEncoder:
+    """
+    Returns an encoder for the first installed spaCy model, or a TF-IDF + SVD encoder fitted on texts if none is.
+
+    Parameters:
+        - texts (list[str]): The corpus to fit the fallback encoder on.
+        - model_names (Iterable[str]): The spaCy models to try, in order.
+
+    Returns:
+        - SpacyEncoder | TfidfSvdEncoder: The encoder.
+    """
+    for model_name in model_names:
+        try:
+            return SpacyEncoder(model_name)
+        except (OSError, ImportError):
+            continue
+    return TfidfSvdEncoder().fit(texts)
+
+
+def _essay_items(essay_id: int, full_text: str | None, summary: str | None) -> tuple[list[list], list[str]]:
+    # The items of one essay as [essay_id, kind, start, end, deleted] rows, and the text each one embeds.
+    items: list[list] = []
+    texts: list[str] = []
+    if summary:
+        items.append([essay_id, 'summary', 0, len(summary), False])
+        texts.append(summary)
+    for start, end in chunk_text(full_text or ''):
+        items.append([essay_id, 'passage', start, end, False])
+        texts.append(full_text[start:end])
+    return items, texts
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    # The positions of the k highest scores in each row, best first.
+    if scores.shape[1] > k:
+        positions = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        positions = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, positions, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(positions, order, axis=1)
+
+
+class EmbeddingIndex:
+    """
+    A memory-mapped store of L2-normalized item vectors with exact and approximate cosine search.
+
+    Use build_embedding_index or load_embedding_index rather than the constructor.
+
+    Parameters:
+        - index_path (str): The path to the vector file. The sidecar is index_path + '.json'.
+        - encoder (SpacyEncoder | TfidfSvdEncoder): The encoder the vectors were made with.
+        - dimensions (int): The number of dimensions of each vector.
+        - items (list[list]): [essay_id, kind, start, end, deleted] for every row.
+    """
+
+    def __init__(self, index_path: str, encoder: SpacyEncoder | TfidfSvdEncoder, dimensions: int, items: list[list]):
+        self.index_path: str = index_path
+        self.encoder = encoder
+        self.dimensions: int = dimensions
+        self.items: list[list] = items
+        self.vectors: np.ndarray = np.zeros((0, dimensions), dtype=np.float32)
+        self.centroids: np.ndarray | None = None
+        self.assignments: np.ndarray | None = None
+        self._alive: np.ndarray = np.ones(0, dtype=bool)
+        self._map_vectors()
+
+    def __len__(self) -> int:
+        return int(self._alive.sum())
+
+    def _map_vectors(self) -> None:
+        # Map the rows listed in the sidecar. Rows past them are left over from an interrupted add and are ignored.
+        if self.items:
+            self.vectors = np.memmap(self.index_path, dtype=np.float32, mode='r', shape=(len(self.items),
+                                                                                          self.dimensions))
+        self._alive = np.array([not item[4] for item in self.items], dtype=bool)
+
+    def add_essays(self, rows: Iterable[tuple[int, str | None, str | None]], batch_size: int = 256) -> int:
+        """
+        Embeds essays and appends their vectors to the index file. Rows already stored for the same essays are marked
+        as deleted. The sidecar is rewritten last, so an interrupted add leaves the index as it was.
+
+        Parameters:
+            - rows (Iterable[tuple[int, str | None, str | None]]): The id, full text, and summary of each essay.
+            - batch_size (int): The number of items embedded at once. Default is 256.
+
+        Returns:
+            - int: The number of rows added.
+        """
+        items: list[list] = []
+        texts: list[str] = []
+        for essay_id, full_text, summary in rows:
+            essay_items, essay_texts = _essay_items(essay_id, full_text, summary)
+            items.extend(essay_items)
+            texts.extend(essay_texts)
+
+        replaced = {item[0] for item in items}
+        for item in self.items:
+            if item[0] in replaced:
+                item[4] = True
+
+        # Drop the memory map before writing to the file it maps.
+        self.vectors = np.zeros((0, self.dimensions), dtype=np.float32)
+        with open(self.index_path, 'r+b' if os.path.exists(self.index_path) else 'wb') as f:
+            f.truncate(len(self.items) * self.dimensions * 4)
+            f.seek(0, os.SEEK_END)
+            for start in range(0, len(texts), batch_size):
+                vectors = _normalize(self.encoder.encode(texts[start:start + batch_size]))
+                f.write(vectors.tobytes())
+                if self.centroids is not None:
+                    self.assignments = np.concatenate([self.assignments, self._nearest_centroids(vectors)])
+
+        self.items.extend(items)
+        self.save()
+        self._map_vectors()
+        return len(items)
+
+    def search(self, query: str, k: int = 5, nprobe: int | None = None) -> list[tuple[int, str, int, int, float]]:
+        """
+        Returns the k items closest to a query.
+
+        Parameters:
+            - query (str): The query.
+            - k (int): The number of results. Default is 5.
+            - nprobe (int | None): The number of clusters to search if build_ivf has been run. Default is None, which
+              searches every row exactly.
+
+        Returns:
+            - list[tuple[int, str, int, int, float]]: The essay id, item kind ('summary' or 'passage'), character span
+              in that column, and cosine similarity of each result, best first.
+        """
+        return self.search_batch([query], k, nprobe)[0]
+
+    def search_batch(self, queries: list[str], k: int = 5, nprobe: int | None = None
+                     ) -> list[list[tuple[int, str, int, int, float]]]:
+        """
+        Returns the k items closest to each of several queries, embedding and scoring them together.
+
+        Parameters:
+            - queries (list[str]): The queries.
+            - k (int): The number of results per query. Default is 5.
+            - nprobe (int | None): The number of clusters to search if build_ivf has been run. Default is None, which
+              searches every row exactly.
+
+        Returns:
+            - list[list[tuple[int, str, int, int, float]]]: The results of each query, as returned by search.
+        """
+        if not queries:
+            return []
+        query_vectors = _normalize(self.encoder.encode(queries))
+        if k < 1 or not len(self):
+            return [[] for _ in queries]
+
+        if nprobe is not None and self.centroids is not None:
+            return [self._format(*self._search_clusters(vector, k, nprobe)) for vector in query_vectors]
+
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self.items), SEARCH_BLOCK_ROWS):
+            block = self.vectors[start:start + SEARCH_BLOCK_ROWS]
+            scores = query_vectors @ block.T
+            scores[:, ~self._alive[start:start + SEARCH_BLOCK_ROWS]] = -np.inf
+            rows = np.concatenate([best_rows, np.broadcast_to(np.arange(start, start + len(block)),
+                                                              (len(queries), len(block)))], axis=1)
+            scores = np.concatenate([best_scores, scores], axis=1)
+            positions = _top_k(scores, k)
+            best_rows = np.take_along_axis(rows, positions, axis=1)
+            best_scores = np.take_along_axis(scores, positions, axis=1)
+
+        return [self._format(rows, scores) for rows, scores in zip(best_rows, best_scores)]
+
+    def _format(self, rows: np.ndarray, scores: np.ndarray) -> list[tuple[int, str, int, int, float]]:
+        results = []
+        for row, score in zip(rows, scores):
+            if np.isfinite(score):
+                essay_id, kind, start, end, _ = self.items[row]
+                results.append((essay_id, kind, start, end, float(score)))
+        return results
+
+    def _search_clusters(self, query_vector: np.ndarray, k: int, nprobe: int) -> tuple[np.ndarray, np.ndarray]:
+        # Score only the live rows assigned to the nprobe clusters whose centroids are closest to the query.
+        clusters = _top_k((self.centroids @ query_vector)[np.newaxis], nprobe)[0]
+        rows = np.flatnonzero(np.isin(self.assignments, clusters) & self._alive)
+        if not len(rows):
+            return rows, np.zeros(0, dtype=np.float32)
+        scores = self.vectors[rows] @ query_vector
+        positions = _top_k(scores[np.newaxis], k)[0]
+        return rows[positions], scores[positions]
+
+    def _nearest_centroids(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def build_ivf(self, n_lists: int | None = None, iterations: int = 10, seed: int = 0) -> None:
+        """
+        Clusters the live vectors with spherical k-means for approximate search, and saves the clusters. Vectors
+        added later are assigned to their nearest cluster.
+
+        Parameters:
+            - n_lists (int | None): The number of clusters. Default is the square root of the number of rows.
+            - iterations (int): The number of k-means iterations. Default is 10.
+            - seed (int): The random seed for the initial centroids. Default is 0.
+
+        Returns:
+            - None
+        """
+        live_rows = np.flatnonzero(self._alive)
+        if not len(live_rows):
+            return
+        if n_lists is None:
+            n_lists = int(np.sqrt(len(live_rows)))
+        n_lists = max(1, min(n_lists, len(live_rows)))
+
+        vectors = np.asarray(self.vectors[live_rows])
+        random = np.random.default_rng(seed)
+        centroids = vectors[random.choice(len(vectors), n_lists, replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            empty = np.bincount(assignments, minlength=n_lists) == 0
+            # Keep the old centroid of a cluster that lost all its vectors.
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+
+        self.centroids = centroids
+        self.assignments = np.zeros(len(self.items), dtype=np.int32)
+        self.assignments[live_rows] = self._nearest_centroids(vectors)
+        self.save()
+
+    def save(self) -> None:
+        """
+        Writes the sidecar, the fitted encoder (if it isn't a spaCy model), and the clusters (if any) next to the
+        vector file. Each file is replaced atomically.
+
+        Returns:
+            - None
+        """
+        metadata: dict[str, Any] = {'encoder': self.encoder.kind, 'dimensions': self.dimensions, 'items': self.items}
+        if isinstance(self.encoder, SpacyEncoder):
+            metadata['model_name'] = self.encoder.model_name
+        else:
+            _replace(f"{self.index_path}.encoder.pkl", pickle.dumps(self.encoder))
+        if self.centroids is not None:
+            with open(f"{self.index_path}.ivf.tmp", 'wb') as f:
+                np.savez(f, centroids=self.centroids, assignments=self.assignments)
+            os.replace(f"{self.index_path}.ivf.tmp", f"{self.index_path}.ivf.npz")
+        _replace(f"{self.index_path}.json", json.dumps(metadata).encode('utf-8'))
+
+
+def _replace(path: str, data: bytes) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def _read_essays(db_path: str, table_name: str, essay_ids: list[int] | None = None
+                 ) -> list[tuple[int, str | None, str | None]]:
+    with connection_pool.connect(db_path) as (conn, cursor):
+        if essay_ids is None:
+            cursor.execute(f"SELECT id, full_text, summary FROM {table_name} ORDER BY id")
+        else:
+            placeholders = ', '.join(['?'] * len(essay_ids))
+            cursor.execute(f"SELECT id, full_text, summary FROM {table_name} WHERE id IN ({placeholders}) ORDER BY id",
+                           essay_ids)
+        return cursor.fetchall()
+
+
+def build_embedding_index(db_path: str = essay_db_path, index_path: str = embedding_index_path,
+                          table_name: str = 'essays', encoder: SpacyEncoder | TfidfSvdEncoder | None = None
+                          ) -> EmbeddingIndex:
+    """
+    Embeds the summary and passages of every essay and saves a new index, replacing any existing one.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+        - index_path (str): The path to the vector file.
+        - table_name (str): The name of the essays table. Default is 'essays'.
+        - encoder (SpacyEncoder | TfidfSvdEncoder | None): The encoder to use. Default is make_encoder fitted on the
+          essays.
+
+    Returns:
+        - EmbeddingIndex: The index.
+    """
+    rows = _read_essays(db_path, table_name)
+    if encoder is None:
+        texts: list[str] = []
+        for essay_id, full_text, summary in rows:
+            texts.extend(_essay_items(essay_id, full_text, summary)[1])
+        encoder = make_encoder(texts)
+
+    dimensions = encoder.encode(['']).shape[1]
+    for path in (index_path, f"{index_path}.ivf.npz"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    index = EmbeddingIndex(index_path, encoder, dimensions, [])
+    index.add_essays(rows)
+    return index
+
+
+def load_embedding_index(index_path: str = embedding_index_path) -> EmbeddingIndex:
+    """
+    Loads an index saved by build_embedding_index. The vectors are memory-mapped rather than read.
+
+    Parameters:
+        - index_path (str): The path to the vector file.
+
+    Returns:
+        - EmbeddingIndex: The index.
+    """
+    with open(f"{index_path}.json", encoding='utf-8') as f:
+        metadata = json.load(f)
+
+    if metadata['encoder'] == SpacyEncoder.kind:
+        encoder = SpacyEncoder(metadata['model_name'])
+    else:
+        with open(f"{index_path}.encoder.pkl", 'rb') as f:
+            encoder = pickle.load(f)
+
+    index = EmbeddingIndex(index_path, encoder, metadata['dimensions'], metadata['items'])
+    if os.path.exists(f"{index_path}.ivf.npz"):
+        with np.load(f"{index_path}.ivf.npz") as clusters:
+            index.centroids = clusters['centroids']
+            index.assignments = clusters['assignments']
+    return index
+
+
+def update_embedding_index(db_path: str = essay_db_path, essay_ids: list[int] | None = None,
+                           index_path: str = embedding_index_path, table_name: str = 'essays') -> int:
+    """
+    Re-embeds the given essays in a saved index. Does nothing if no index has been built yet.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+        - essay_ids (list[int] | None): The ids of the new or changed essays. Default is None, which means all.
+        - index_path (str): The path to the vector file.
+        - table_name (str): The name of the essays table. Default is 'essays'.
+
+    Returns:
+        - int: The number of rows added to the index.
+    """
+    if not os.path.exists(f"{index_path}.json"):
+        return 0
+    index = load_embedding_index(index_path)
+    return index.add_essays(_read_essays(db_path, table_name, essay_ids))
+
+
+def main():
+    """
+    Rebuilds the embedding index of the essay database. With --ivf, also clusters it for approximate search.
+
+    Parameters:
+        - None
+
+    Returns:
+        - None
+    """
+    start = time.perf_counter()
+    index = build_embedding_index(essay_db_path, embedding_index_path)
+    print(f"Embedded {len(index)} items with {index.encoder.kind} ({index.dimensions} dimensions) in "
+          f"{time.perf_counter() - start:.2f} seconds.")
+
+    if '--ivf' in sys.argv:
+        start = time.perf_counter()
+        index.build_ivf()
+        print(f"Clustered the index into {len(index.centroids)} lists in {time.perf_counter() - start:.2f} seconds.")
+
+
+if __name__ == '__main__':
+    main()
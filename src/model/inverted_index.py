@@ -0,0 +1,400 @@
+# src\model\inverted_index.py
+"""
+This file contains an inverted index over the lemmatized essay content, used by the chatbot to retrieve essays.
+
+The index is built from the content column that init_processing.process_content produces, and queries are normalized
+with the same function, so query terms and indexed terms always match. Each term's postings are stored as two flat
+arrays: the gaps between consecutive document numbers (delta-encoded) and the term frequencies. Every block of
+BLOCK_SIZE postings also records its last document number, so a posting list can be searched without decoding all of
+it.
+
+Documents are ranked with BM25. Query terms are scored in decreasing order of their maximum possible contribution, and
+once the terms left can no longer lift an unseen document into the top k, only the documents that can still make it
+are looked up in the remaining posting lists (max-score pruning).
+
+The index is saved as a single binary file that load_index maps into memory, so loading costs a read of the
+vocabulary and nothing more.
+
+Classes include:
+
+    - InvertedIndex - A BM25 inverted index over the essays.
+
+Functions include:
+
+    - build_index(db_path: str, table_name: str, k1: float, b: float) - Builds an index from the content column of the essays table.
+    - load_index(index_path: str) - Loads an index saved by InvertedIndex.save, memory-mapping its arrays.
+    - main() - Rebuilds the essay index and saves it next to the database.
+"""
+
+import json
+import math
+import os
+import struct
+import time
+from collections import Counter
+from typing import Any
+
+import numpy as np
+
+from file_setup import connection_pool, init_processing
+from file_setup.config import essay_db_path, essay_index_path
+
+# The number of postings between two skip entries.
+BLOCK_SIZE: int = 128
+
+_MAGIC: bytes = b'EIDX'
+_VERSION: int = 1
+# Magic, version, and the length of the JSON metadata that follows.
+_HEADER = struct.Struct('<4sII')
+# The arrays saved after the metadata, in order, with their dtypes.
+_ARRAYS: dict[str, str] = {
+    'doc_ids': '<i8',
+    'doc_lengths': '<u4',
+    'term_offsets': '<u8',
+    'block_offsets': '<u8',
+    'max_scores': '<f4',
+    'block_last_docs': '<u4',
+    'doc_gaps': '<u4',
+    'term_frequencies': '<u4',
+    'terms': 'u1',
+}
+
+
+class InvertedIndex:
+    """
+    A BM25 inverted index over the essays.
+
+    Postings of term t are doc_gaps[term_offsets[t]:term_offsets[t + 1]] (and the matching term_frequencies), and its
+    skip entries are block_last_docs[block_offsets[t]:block_offsets[t + 1]]. Documents are numbered by their position
+    in doc_ids.
+
+    Parameters:
+        - terms (list[str]): The vocabulary, indexed by term number.
+        - arrays (dict[str, np.ndarray]): The index arrays, as listed in _ARRAYS (without 'terms').
+        - k1 (float): The BM25 term frequency saturation.
+        - b (float): The BM25 document length normalization.
+    """
+
+    def __init__(self, terms: list[str], arrays: dict[str, np.ndarray], k1: float = 1.2, b: float = 0.75):
+        self.terms: list[str] = terms
+        self.term_ids: dict[str, int] = {term: term_id for term_id, term in enumerate(terms)}
+        self.k1: float = k1
+        self.b: float = b
+        self.doc_ids: np.ndarray = arrays['doc_ids']
+        self.doc_lengths: np.ndarray = arrays['doc_lengths']
+        self.term_offsets: np.ndarray = arrays['term_offsets']
+        self.block_offsets: np.ndarray = arrays['block_offsets']
+        self.max_scores: np.ndarray = arrays['max_scores']
+        self.block_last_docs: np.ndarray = arrays['block_last_docs']
+        self.doc_gaps: np.ndarray = arrays['doc_gaps']
+        self.term_frequencies: np.ndarray = arrays['term_frequencies']
+
+        self.n_docs: int = len(self.doc_ids)
+        self.average_length: float = float(self.doc_lengths.mean()) if self.n_docs else 0.0
+        # The length-dependent part of the BM25 denominator, per document.
+        self._length_norms: np.ndarray = _length_norms(self.doc_lengths, self.average_length, k1, b)
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def document_frequency(self, term_id: int) -> int:
+        """
+        Returns the number of documents that contain a term.
+
+        Parameters:
+            - term_id (int): The term number.
+
+        Returns:
+            - int: The document frequency.
+        """
+        return int(self.term_offsets[term_id + 1] - self.term_offsets[term_id])
+
+    def postings(self, term_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Decodes a term's full posting list.
+
+        Parameters:
+            - term_id (int): The term number.
+
+        Returns:
+            - np.ndarray: The document numbers, ascending.
+            - np.ndarray: The term frequency in each of those documents.
+        """
+        start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+        docs = np.cumsum(self.doc_gaps[start:end], dtype=np.int64)
+        return docs, self.term_frequencies[start:end]
+
+    def lookup(self, term_id: int, docs: np.ndarray) -> np.ndarray:
+        """
+        Returns a term's frequency in each of the given documents, decoding only the blocks they fall in.
+
+        Parameters:
+            - term_id (int): The term number.
+            - docs (np.ndarray): Document numbers, ascending.
+
+        Returns:
+            - np.ndarray: The term frequency in each document, 0 where the term does not occur.
+        """
+        frequencies = np.zeros(len(docs), dtype=np.uint32)
+        start = int(self.term_offsets[term_id])
+        end = int(self.term_offsets[term_id + 1])
+        last_docs = self.block_last_docs[self.block_offsets[term_id]:self.block_offsets[term_id + 1]]
+        blocks = np.searchsorted(last_docs, docs)
+
+        for block in np.unique(blocks[blocks < len(last_docs)]):
+            block_start = start + int(block) * BLOCK_SIZE
+            block_end = min(block_start + BLOCK_SIZE, end)
+            # Gaps chain across blocks, so a block decodes from the previous block's last document.
+            base = int(last_docs[block - 1]) if block else 0
+            block_docs = base + np.cumsum(self.doc_gaps[block_start:block_end], dtype=np.int64)
+
+            in_block = np.flatnonzero(blocks == block)
+            positions = np.searchsorted(block_docs, docs[in_block])
+            positions[positions == len(block_docs)] = 0
+            found = block_docs[positions] == docs[in_block]
+            frequencies[in_block[found]] = self.term_frequencies[block_start:block_end][positions[found]]
+
+        return frequencies
+
+    def _idf(self, term_id: int) -> float:
+        document_frequency = self.document_frequency(term_id)
+        return math.log(1 + (self.n_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _term_scores(self, term_id: int, docs: np.ndarray, frequencies: np.ndarray) -> np.ndarray:
+        frequencies = frequencies.astype(np.float32)
+        return self._idf(term_id) * frequencies * (self.k1 + 1) / (frequencies + self._length_norms[docs])
+
+    def search_terms(self, terms: list[str], k: int = 5) -> list[tuple[int, float]]:
+        """
+        Returns the k documents with the highest BM25 score for already normalized query terms.
+
+        Parameters:
+            - terms (list[str]): The lemmatized query terms. Unknown and repeated terms are ignored.
+            - k (int): The number of results. Default is 5.
+
+        Returns:
+            - list[tuple[int, float]]: The essay id and score of each result, best first.
+        """
+        term_ids = {self.term_ids[term] for term in terms if term in self.term_ids}
+        if k < 1 or not term_ids:
+            return []
+
+        # Score the terms with the largest possible contribution first, so the threshold rises as early as possible.
+        ordered = sorted(term_ids, key=lambda term_id: -self.max_scores[term_id])
+        remaining = np.cumsum([self.max_scores[term_id] for term_id in ordered][::-1])[::-1].tolist() + [0.0]
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        candidates: np.ndarray | None = None
+        for position, term_id in enumerate(ordered):
+            if candidates is None:
+                docs, frequencies = self.postings(term_id)
+                scores[docs] += self._term_scores(term_id, docs, frequencies)
+            else:
+                frequencies = self.lookup(term_id, candidates)
+                present = frequencies > 0
+                scores[candidates[present]] += self._term_scores(term_id, candidates[present], frequencies[present])
+
+            # Once the terms left can't lift a document from zero past the k-th best score, no new document can enter
+            # the top k: from now on only look up the documents that can still reach it.
+            matched = np.flatnonzero(scores) if candidates is None else candidates
+            if len(matched) < k:
+                continue
+            threshold = np.partition(scores[matched], len(matched) - k)[len(matched) - k]
+            if remaining[position + 1] < threshold:
+                candidates = matched[scores[matched] + remaining[position + 1] >= threshold]
+
+        matched = np.flatnonzero(scores) if candidates is None else candidates
+        # Sort by score, best first, breaking ties by essay id.
+        best = matched[np.lexsort((self.doc_ids[matched], -scores[matched]))][:k]
+        return [(int(self.doc_ids[doc]), float(scores[doc])) for doc in best]
+
+    def search(self, query: str, k: int = 5, lemmatizer: Any = None, stop_words: set[str] | None = None
+               ) -> list[tuple[int, float]]:
+        """
+        Returns the k essays that best match a free-text query, ranked by BM25.
+
+        The query is normalized with init_processing.process_content, exactly like the indexed content.
+
+        Parameters:
+            - query (str): The query.
+            - k (int): The number of results. Default is 5.
+            - lemmatizer: The lemmatizer object. Defaults to the one from init_processing.setup_lemmatizer.
+            - stop_words (set[str] | None): The stop words. Defaults to the ones from init_processing.setup_lemmatizer.
+
+        Returns:
+            - list[tuple[int, float]]: The essay id and score of each result, best first.
+        """
+        if lemmatizer is None or stop_words is None:
+            lemmatizer, stop_words = init_processing.setup_lemmatizer()
+        return self.search_terms(init_processing.process_content(query, lemmatizer, stop_words).split(), k)
+
+    def save(self, index_path: str) -> None:
+        """
+        Saves the index to a binary file that load_index can memory-map. The file is replaced atomically.
+
+        Parameters:
+            - index_path (str): The path to the index file.
+
+        Returns:
+            - None
+        """
+        arrays = {name: getattr(self, name) for name in _ARRAYS if name != 'terms'}
+        arrays['terms'] = np.frombuffer('\n'.join(self.terms).encode('utf-8'), dtype=np.uint8)
+
+        metadata: dict[str, Any] = {'k1': self.k1, 'b': self.b, 'block_size': BLOCK_SIZE, 'arrays': {}}
+        offset = 0
+        for name, dtype in _ARRAYS.items():
+            array = np.ascontiguousarray(arrays[name], dtype=dtype)
+            arrays[name] = array
+            metadata['arrays'][name] = [offset, len(array)]
+            # Keep every array 8-byte aligned so it can be viewed in place.
+            offset += -(-array.nbytes // 8) * 8
+
+        encoded = json.dumps(metadata).encode('utf-8')
+        data_start = -(-(_HEADER.size + len(encoded)) // 8) * 8
+        temp_path = f"{index_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(encoded)))
+            f.write(encoded)
+            for name in _ARRAYS:
+                f.seek(data_start + metadata['arrays'][name][0])
+                f.write(arrays[name].tobytes())
+            f.truncate(data_start + offset)
+        os.replace(temp_path, index_path)
+
+
+def _length_norms(doc_lengths: np.ndarray, average_length: float, k1: float, b: float) -> np.ndarray:
+    if not average_length:
+        return np.full(len(doc_lengths), k1, dtype=np.float32)
+    return (k1 * (1 - b + b * doc_lengths / average_length)).astype(np.float32)
+
+
+def build_index(db_path: str = essay_db_path, table_name: str = 'essays', k1: float = 1.2, b: float = 0.75
+                ) -> InvertedIndex:
+    """
+    Builds an index from the lemmatized content column of the essays table.
+
+    Parameters:
+        - db_path (str): The path to the database file.
+        - table_name (str): The name of the essays table. Default is 'essays'.
+        - k1 (float): The BM25 term frequency saturation. Default is 1.2.
+        - b (float): The BM25 document length normalization. Default is 0.75.
+
+    Returns:
+        - InvertedIndex: The index.
+    """
+    doc_ids: list[int] = []
+    doc_lengths: list[int] = []
+    term_ids: dict[str, int] = {}
+    postings: list[list[tuple[int, int]]] = []
+
+    with connection_pool.connect(db_path) as (conn, cursor):
+        cursor.execute(f"SELECT id, content FROM {table_name} ORDER BY id")
+        for doc, (essay_id, content) in enumerate(cursor):
+            words = (content or '').split()
+            doc_ids.append(essay_id)
+            doc_lengths.append(len(words))
+            for term, frequency in Counter(words).items():
+                term_id = term_ids.setdefault(term, len(term_ids))
+                if term_id == len(postings):
+                    postings.append([])
+                postings[term_id].append((doc, frequency))
+
+    lengths = np.array(doc_lengths, dtype=np.uint32)
+    average_length = float(lengths.mean()) if len(lengths) else 0.0
+    length_norms = _length_norms(lengths, average_length, k1, b)
+    n_docs = len(doc_ids)
+
+    term_offsets = np.zeros(len(postings) + 1, dtype=np.uint64)
+    block_offsets = np.zeros(len(postings) + 1, dtype=np.uint64)
+    max_scores = np.zeros(len(postings), dtype=np.float32)
+    gap_chunks: list[np.ndarray] = []
+    frequency_chunks: list[np.ndarray] = []
+    block_chunks: list[np.ndarray] = []
+    for term_id, term_postings in enumerate(postings):
+        docs = np.fromiter((doc for doc, _ in term_postings), dtype=np.int64, count=len(term_postings))
+        frequencies = np.fromiter((frequency for _, frequency in term_postings), dtype=np.uint32,
+                                  count=len(term_postings))
+        gap_chunks.append(np.diff(docs, prepend=0).astype(np.uint32))
+        frequency_chunks.append(frequencies)
+        block_chunks.append(docs[BLOCK_SIZE - 1::BLOCK_SIZE] if len(docs) % BLOCK_SIZE == 0
+                            else np.append(docs[BLOCK_SIZE - 1::BLOCK_SIZE], docs[-1]))
+        term_offsets[term_id + 1] = term_offsets[term_id] + len(docs)
+        block_offsets[term_id + 1] = block_offsets[term_id] + len(block_chunks[-1])
+
+        idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+        max_scores[term_id] = np.max(idf * frequencies * (k1 + 1) / (frequencies + length_norms[docs]))
+
+    def concatenate(chunks: list[np.ndarray], dtype: Any) -> np.ndarray:
+        return np.concatenate(chunks).astype(dtype) if chunks else np.zeros(0, dtype=dtype)
+
+    arrays = {
+        'doc_ids': np.array(doc_ids, dtype=np.int64),
+        'doc_lengths': lengths,
+        'term_offsets': term_offsets,
+        'block_offsets': block_offsets,
+        'max_scores': max_scores,
+        'block_last_docs': concatenate(block_chunks, np.uint32),
+        'doc_gaps': concatenate(gap_chunks, np.uint32),
+        'term_frequencies': concatenate(frequency_chunks, np.uint32),
+    }
+    return InvertedIndex(list(term_ids), arrays, k1, b)
+
+
+def load_index(index_path: str = essay_index_path) -> InvertedIndex:
+    """
+    Loads an index saved by InvertedIndex.save. The arrays are memory-mapped rather than read, so the operating system
+    pages postings in as queries touch them.
+
+    Parameters:
+        - index_path (str): The path to the index file.
+
+    Raises:
+        ValueError: If the file is not an index file or was written by an incompatible version.
+
+    Returns:
+        - InvertedIndex: The index.
+    """
+    mapped = np.memmap(index_path, dtype=np.uint8, mode='r')
+    magic, version, metadata_length = _HEADER.unpack(bytes(mapped[:_HEADER.size]))
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{index_path} is not a version {_VERSION} essay index.")
+
+    metadata = json.loads(bytes(mapped[_HEADER.size:_HEADER.size + metadata_length]))
+    if metadata['block_size'] != BLOCK_SIZE:
+        raise ValueError(f"{index_path} was built with a block size of {metadata['block_size']}.")
+
+    data_start = -(-(_HEADER.size + metadata_length) // 8) * 8
+    arrays: dict[str, np.ndarray] = {}
+    for name, dtype in _ARRAYS.items():
+        offset, count = metadata['arrays'][name]
+        start = data_start + offset
+        arrays[name] = mapped[start:start + count * np.dtype(dtype).itemsize].view(dtype)
+
+    terms_blob = arrays.pop('terms').tobytes().decode('utf-8')
+    terms = terms_blob.split('\n') if terms_blob else []
+    return InvertedIndex(terms, arrays, metadata['k1'], metadata['b'])
+
+
+def main():
+    """
+    Rebuilds the essay index from the database and saves it next to the database.
+
+    Parameters:
+        - None
+
+    Returns:
+        - None
+    """
+    start = time.perf_counter()
+    index = build_index(essay_db_path)
+    index.save(essay_index_path)
+    print(f"Indexed {len(index)} essays and {len(index.terms)} terms in {time.perf_counter() - start:.2f} seconds.")
+
+    start = time.perf_counter()
+    load_index(essay_index_path)
+    print(f"Loaded the index in {(time.perf_counter() - start) * 1000:.1f} ms.")
+
+
+if __name__ == '__main__':
+    main()
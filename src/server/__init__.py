@@ -0,0 +1,12 @@
+"""
+Functions in this module serve the chatbot web app and answer its questions from the essay database.
+
+Files:
+
+    - answer_engine.py: Retrieves the essays that match a question and composes an answer from them.
+    - chat_server.py: Asyncio HTTP server for the web app and the streaming /chat endpoint.
+
+NOTES:
+    The server is run separately in CLI.
+        Command is "python -m src.server.chat_server"
+"""
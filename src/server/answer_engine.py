@@ -0,0 +1,181 @@
+# src\server\answer_engine.py
+"""
+This file contains the answer engine behind the chat server. It retrieves the essays that best match a question and
+composes an answer from their full text, summary, and keywords.
+
+The engine is started once per process and keeps its retrieval index warm. When the NLTK data that process_content
+needs is installed, questions are matched against the BM25 inverted index of the lemmatized essays (loaded from its
+memory-mapped file, or built if there is none). Otherwise the engine falls back to the FTS5 index in essays.db, which
+needs no NLTK data.
+
+Classes include:
+
+    - AnswerEngine(db_path: str, index_path: str, table_name: str) - Retrieves essays for questions and composes answers.
+
+Functions include:
+
+    - best_passage(question: str, full_text: str) - Returns the passage of an essay that shares the most words with a question.
+"""
+
+import os
+import re
+from typing import Any, Iterator
+
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from data.data_augmentation import data_query
+from file_setup import connection_pool, init_processing, nlp_resources
+from file_setup.config import essay_db_path, essay_index_path
+from src.model import inverted_index
+from src.model.embedding_index import chunk_text
+
+# The largest number of keywords quoted in an answer.
+MAX_KEYWORDS: int = 8
+NO_ANSWER: str = "I couldn't find anything about that in the essays."
+
+_WORD = re.compile(r"[a-z]+")
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def _words(text: str) -> set[str]:
+    return {word for word in _WORD.findall(text.lower()) if word not in ENGLISH_STOP_WORDS}
+
+
+def best_passage(question: str, full_text: str) -> str:
+    """
+    Returns the passage of an essay that shares the most (non stop) words with a question, or its first passage if
+    none share any.
+
+    Parameters:
+        - question (str): The question.
+        - full_text (str): The full text of the essay.
+
+    Returns:
+        - str: The passage.
+    """
+    spans = chunk_text(full_text or '')
+    if not spans:
+        return ''
+    question_words = _words(question)
+    start, end = max(spans, key=lambda span: len(question_words & _words(full_text[span[0]:span[1]])))
+    return full_text[start:end]
+
+
+class AnswerEngine:
+    """
+    Retrieves the essays that best match a question and composes an answer from them.
+
+    Parameters:
+        - db_path (str): The path to the essay database.
+        - index_path (str): The path to the inverted index file. It is built there if missing and its directory exists.
+        - table_name (str): The name of the essays table. Default is 'essays'.
+    """
+
+    def __init__(self, db_path: str = essay_db_path, index_path: str = essay_index_path, table_name: str = 'essays'):
+        self.db_path: str = db_path
+        self.index_path: str = index_path
+        self.table_name: str = table_name
+        self.index: inverted_index.InvertedIndex | None = None
+        self.lemmatizer: Any = None
+        self.stop_words: set[str] | None = None
+        self.started: bool = False
+
+    def start(self) -> None:
+        """
+        Loads the NLP resources and the retrieval index, so the first question doesn't pay for them.
+
+        Returns:
+            - None
+        """
+        nltk_ready = (nlp_resources.ensure_nltk_resources(('stopwords', 'wordnet'), download=False)
+                      and (nlp_resources.nltk_resource_available('punkt_tab')
+                           or nlp_resources.nltk_resource_available('punkt')))
+        if nltk_ready:
+            self.lemmatizer, self.stop_words = init_processing.setup_lemmatizer()
+            if os.path.isfile(self.index_path):
+                self.index = inverted_index.load_index(self.index_path)
+            else:
+                self.index = inverted_index.build_index(self.db_path, self.table_name)
+                if os.path.isdir(os.path.dirname(self.index_path)):
+                    self.index.save(self.index_path)
+        else:
+            data_query.create_search_index(self.db_path, self.table_name)
+        self.started = True
+
+    def retrieve(self, question: str, k: int = 3) -> list[dict[str, Any]]:
+        """
+        Returns the k essays that best match a question.
+
+        Parameters:
+            - question (str): The question.
+            - k (int): The number of essays. Default is 3.
+
+        Returns:
+            - list[dict[str, Any]]: The id, title, year, summary, and keywords of each essay, best first. The first
+              essay also has the passage that best matches the question; the others have an empty passage.
+        """
+        if not self.started:
+            self.start()
+
+        if self.index is not None:
+            essay_ids = [essay_id for essay_id, _ in self.index.search(question, k, self.lemmatizer, self.stop_words)]
+        else:
+            essay_ids = [row[0] for row in data_query.search_essays(question, k, self.db_path, self.table_name)]
+        if not essay_ids:
+            return []
+
+        placeholders = ', '.join(['?'] * len(essay_ids))
+        with connection_pool.connect(self.db_path) as (conn, cursor):
+            cursor.execute(f"SELECT id, title, year, summary, keywords, full_text FROM {self.table_name} "
+                           f"WHERE id IN ({placeholders})", essay_ids)
+            rows = {row[0]: row for row in cursor.fetchall()}
+
+        essays = []
+        for essay_id in essay_ids:
+            if essay_id not in rows:
+                continue
+            _, title, year, summary, keywords, full_text = rows[essay_id]
+            # Only the best essay is quoted, so only its passage is worth finding.
+            passage = best_passage(question, full_text) if not essays else ''
+            essays.append({'id': essay_id, 'title': title, 'year': year, 'summary': summary or '',
+                           'keywords': keywords or '', 'passage': passage})
+        return essays
+
+    def compose(self, essays: list[dict[str, Any]]) -> Iterator[str]:
+        """
+        Yields the answer built from retrieved essays, one sentence or line at a time.
+
+        Parameters:
+            - essays (list[dict[str, Any]]): The essays returned by retrieve.
+
+        Returns:
+            - Iterator[str]: The parts of the answer. Joined, they form the whole answer.
+        """
+        if not essays:
+            yield NO_ANSWER
+            return
+
+        best = essays[0]
+        yield f'From "{best["title"]}" ({best["year"]}): '
+        for sentence in _SENTENCE_END.split(best['passage']):
+            yield sentence + ' '
+        if best['summary']:
+            yield f'\nSummary: {best["summary"]}'
+        if best['keywords']:
+            keywords = [keyword.strip() for keyword in best['keywords'].split(',') if keyword.strip()]
+            yield f'\nKeywords: {", ".join(keywords[:MAX_KEYWORDS])}'
+        for essay in essays[1:]:
+            yield f'\nSee also: "{essay["title"]}" ({essay["year"]})'
+
+    def answer(self, question: str, k: int = 3) -> str:
+        """
+        Answers a question in one piece.
+
+        Parameters:
+            - question (str): The question.
+            - k (int): The number of essays to retrieve. Default is 3.
+
+        Returns:
+            - str: The answer.
+        """
+        return ''.join(self.compose(self.retrieve(question, k)))
@@ -0,0 +1,250 @@
+# src\server\chat_server.py
+"""
+This file contains the chat server: a small asyncio HTTP server that serves the web app in src/web and answers
+questions from the essay database. It only uses the standard library and listens on localhost by default.
+
+Routes:
+
+    - GET /, GET /<file>: Files from the web directory ('/' is Chatbot.html).
+    - POST /chat: Body {"message": "..."}. The answer is streamed as newline-delimited JSON over a chunked response:
+      {"delta": "..."} lines as the answer is composed, then {"done": true, "sources": [...]}, or {"error": "..."}.
+
+The answer engine is started before the server accepts connections. Retrieval runs in a thread pool, so requests are
+handled concurrently while the event loop keeps streaming, and every worker thread reuses its own pooled connection
+to the database.
+
+Functions include:
+
+    - handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, engine: AnswerEngine, web_dir: str, executor: ThreadPoolExecutor) - Serves the HTTP requests of one client connection.
+    - start_server(engine: AnswerEngine, web_dir: str, host: str, port: int, executor: ThreadPoolExecutor) - Starts the engine and the server, and returns the server.
+    - serve(db_path: str, web_dir: str, host: str, port: int, workers: int) - Runs the chat server until it is cancelled.
+    - main() - Runs the chat server from the command line.
+"""
+
+import argparse
+import asyncio
+import json
+import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+from file_setup import connection_pool
+from file_setup.config import essay_db_path, essay_index_path, web_dir as default_web_dir, server_host, server_port
+from src.server.answer_engine import AnswerEngine
+
+MAX_HEADER_BYTES: int = 16 * 1024
+MAX_BODY_BYTES: int = 64 * 1024
+MAX_MESSAGE_CHARS: int = 2000
+INDEX_FILE: str = 'Chatbot.html'
+
+_REASONS: dict[int, str] = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status: int = status
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, dict[str, str], bytes] | None:
+    # Read one request. Returns None if the client closed the connection between requests.
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise _BadRequest(400, "Incomplete request.")
+    except asyncio.LimitOverrunError:
+        raise _BadRequest(413, "Request headers are too large.")
+
+    request_line, *header_lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, _ = request_line.split(' ', 2)
+    except ValueError:
+        raise _BadRequest(400, "Malformed request line.")
+
+    headers: dict[str, str] = {}
+    for line in header_lines:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get('content-length', '0') or '0')
+    if length > MAX_BODY_BYTES:
+        raise _BadRequest(413, "Request body is too large.")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target.split('?', 1)[0], headers, body
+
+
+def _head(status: int, headers: dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"] + [f"{name}: {value}" for name, value in headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def _send(writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str, keep_alive: bool) -> None:
+    writer.write(_head(status, {'Content-Type': content_type, 'Content-Length': str(len(body)),
+                                'Connection': 'keep-alive' if keep_alive else 'close'}) + body)
+    await writer.drain()
+
+
+async def _send_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+    writer.write(f"{len(data):X}\r\n".encode('latin-1') + data + b"\r\n")
+    await writer.drain()
+
+
+def _static_file(web_dir: str, target: str) -> str | None:
+    # Map a request path to a file in the web directory, refusing anything outside it.
+    root = os.path.realpath(web_dir)
+    relative = target.lstrip('/') or INDEX_FILE
+    path = os.path.realpath(os.path.join(root, relative))
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+async def _stream_answer(writer: asyncio.StreamWriter, engine: AnswerEngine, executor: ThreadPoolExecutor,
+                         message: str, keep_alive: bool) -> None:
+    # Send the headers right away, then retrieve off the event loop and stream the answer as it is composed.
+    writer.write(_head(200, {'Content-Type': 'application/x-ndjson', 'Transfer-Encoding': 'chunked',
+                             'Cache-Control': 'no-cache', 'Connection': 'keep-alive' if keep_alive else 'close'}))
+    loop = asyncio.get_running_loop()
+    try:
+        essays = await loop.run_in_executor(executor, engine.retrieve, message)
+        for part in engine.compose(essays):
+            await _send_chunk(writer, json.dumps({'delta': part}).encode('utf-8') + b'\n')
+        sources = [{'id': essay['id'], 'title': essay['title'], 'year': essay['year']} for essay in essays]
+        await _send_chunk(writer, json.dumps({'done': True, 'sources': sources}).encode('utf-8') + b'\n')
+    except Exception as e:
+        await _send_chunk(writer, json.dumps({'error': str(e)}).encode('utf-8') + b'\n')
+    await _send_chunk(writer, b'')
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, engine: AnswerEngine,
+                            web_dir: str, executor: ThreadPoolExecutor) -> None:
+    """
+    Serves the HTTP requests of one client connection until the client closes it or asks to.
+
+    Parameters:
+        - reader (asyncio.StreamReader): The connection's reader.
+        - writer (asyncio.StreamWriter): The connection's writer.
+        - engine (AnswerEngine): The started answer engine.
+        - web_dir (str): The directory of the web app.
+        - executor (ThreadPoolExecutor): The threads retrieval runs in.
+
+    Returns:
+        - None
+    """
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except _BadRequest as e:
+                await _send(writer, e.status, str(e).encode('utf-8'), 'text/plain; charset=utf-8', False)
+                return
+            if request is None:
+                return
+
+            method, target, headers, body = request
+            keep_alive = headers.get('connection', '').lower() != 'close'
+
+            if target == '/chat':
+                if method != 'POST':
+                    await _send(writer, 405, b'Use POST.', 'text/plain; charset=utf-8', keep_alive)
+                    continue
+                try:
+                    message = json.loads(body or b'{}').get('message', '')
+                except (ValueError, AttributeError):
+                    message = None
+                if not isinstance(message, str) or not message.strip() or len(message) > MAX_MESSAGE_CHARS:
+                    await _send(writer, 400, b'Expected {"message": "..."}.', 'text/plain; charset=utf-8', keep_alive)
+                    continue
+                await _stream_answer(writer, engine, executor, message, keep_alive)
+            elif method == 'GET':
+                path = _static_file(web_dir, target)
+                if path is None:
+                    await _send(writer, 404, b'Not found.', 'text/plain; charset=utf-8', keep_alive)
+                    continue
+                with open(path, 'rb') as f:
+                    content = f.read()
+                content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+                await _send(writer, 200, content, content_type, keep_alive)
+            else:
+                await _send(writer, 405, b'Method not allowed.', 'text/plain; charset=utf-8', keep_alive)
+
+            if not keep_alive:
+                return
+    except (ConnectionError, asyncio.IncompleteReadError):
+        return
+    finally:
+        writer.close()
+
+
+async def start_server(engine: AnswerEngine, web_dir: str = default_web_dir, host: str = server_host,
+                       port: int = server_port, executor: ThreadPoolExecutor | None = None) -> asyncio.Server:
+    """
+    Starts the answer engine (in the executor, so the index loads off the event loop) and then the server.
+
+    Parameters:
+        - engine (AnswerEngine): The answer engine.
+        - web_dir (str): The directory of the web app.
+        - host (str): The address to listen on.
+        - port (int): The port to listen on. 0 picks a free port.
+        - executor (ThreadPoolExecutor | None): The threads retrieval runs in. Default is a new pool of 4 threads.
+
+    Returns:
+        - asyncio.Server: The listening server.
+    """
+    executor = executor or ThreadPoolExecutor(max_workers=4, thread_name_prefix='chat')
+    await asyncio.get_running_loop().run_in_executor(executor, engine.start)
+    return await asyncio.start_server(partial(handle_connection, engine=engine, web_dir=web_dir, executor=executor),
+                                      host, port, limit=MAX_HEADER_BYTES)
+
+
+async def serve(db_path: str = essay_db_path, web_dir: str = default_web_dir, host: str = server_host,
+                port: int = server_port, workers: int = 4) -> None:
+    """
+    Runs the chat server until it is cancelled, with the database connections pooled per worker thread.
+
+    Parameters:
+        - db_path (str): The path to the essay database.
+        - web_dir (str): The directory of the web app.
+        - host (str): The address to listen on.
+        - port (int): The port to listen on.
+        - workers (int): The number of retrieval threads. Default is 4.
+
+    Returns:
+        - None
+    """
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chat')
+    with connection_pool.pooled(db_path):
+        engine = AnswerEngine(db_path, essay_index_path)
+        server = await start_server(engine, web_dir, host, port, executor)
+        address: Any = server.sockets[0].getsockname()
+        print(f"Chat server listening on http://{address[0]}:{address[1]}/")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the chat server.")
+    parser.add_argument("--host", default=server_host, help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=server_port, help="Port to listen on.")
+    parser.add_argument("--db", default=essay_db_path, help="Path to the essay database.")
+    parser.add_argument("--web-dir", default=default_web_dir, help="Directory of the web app.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of retrieval threads.")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.db, args.web_dir, args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
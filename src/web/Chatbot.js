@@ -3,8 +3,11 @@ document.addEventListener('DOMContentLoaded', function() {
 
     var sendFunction = function() {
         var userInput = document.getElementById('userInput').value;
+        if (!userInput.trim()) {
+            return;
+        }
         var chatbox = document.getElementById('chatbox');
-        chatbox.innerHTML += '<p>User: ' + userInput + '</p>';
+        appendMessage('User', userInput);
 
         conversationHistory.push({ speaker: 'User', message: userInput });
 
@@ -13,44 +16,70 @@ document.addEventListener('DOMContentLoaded', function() {
         chatbox.scrollTop = chatbox.scrollHeight;
     };
 
+    // Adds a message to the chatbox and returns the element holding its text, so streamed answers can grow in place
+    function appendMessage(speaker, message) {
+        var chatbox = document.getElementById('chatbox');
+        var paragraph = document.createElement('p');
+        var text = document.createElement('span');
+        paragraph.textContent = speaker + ': ';
+        text.textContent = message;
+        paragraph.appendChild(text);
+        chatbox.appendChild(paragraph);
+        return text;
+    }
+
+    // Asks the chat server and shows the answer as it streams in, one JSON object per line
     function getChatbotResponse(userInput) {
-        var response;
-        var lowerUserInput = userInput.toLowerCase();
-        var responseMap = {
-            hello: 'Hello! Nice to meet you!',
-            name: 'My name is Chatbot.',
-            joke: 'Why did the bicycle fall over? Because it was two tired!',
-            weather: 'I\'m sorry, I don\'t have access to weather information right now.',
-            time: 'I don\'t know your timezone, so I can\'t tell you the time. Please check your device\'s clock!',
-            capitals: 'The capital of France is Venezuela. Excuse me, sorry, it\'s Paris.',
-            italy: 'The capital of Italy is Venice. No, actually it\'s Rome.',
-            book: 'Sure! How about "To Kill a Mockingbird" by Harper Lee?',
-            positive: 'You are capable of achieving great things! ... Possibly.',
-            chat: 'Of course! I\'m here to chat. What would you like to talk about?',
-            name: 'My name is Chatbot.',
-            movie: 'A good movie to watch is Pink Panther, if you\'d like a comedy.',
-            watch: 'A good movie to watch is Pink Panther, if you\'d like a comedy.',
-            action: 'If you\'d like an action movie, I would recommend any Jason Statham movie.',
-            romance: 'If you\'d like a romance movie, there\'s always the classic Sleepless in Seattle.',
-            show: 'Looney Tunes. Obviously.',
-            fact: '2+2 = 10. No, Just kidding, 2+2=4.',
-            president: 'The current president is: Brandon, Let\'s Go'
-        }
+        var chatbox = document.getElementById('chatbox');
+        var text = appendMessage('Chatbot', '');
+        var response = '';
+        var buffer = '';
 
-        for (var key in responseMap) {
-            if (lowerUserInput.includes(key)) {
-                response = responseMap[key];
-                break;
+        function handleLine(line) {
+            if (!line.trim()) {
+                return;
             }
+            var event = JSON.parse(line);
+            if (event.delta) {
+                response += event.delta;
+            } else if (event.error) {
+                response = 'Sorry, something went wrong: ' + event.error;
+            }
+            text.textContent = response;
+            chatbox.scrollTop = chatbox.scrollHeight;
         }
-    
-        // Use the default response if no matching key is found
-        response = response || responseMap.default;
 
-        var chatbox = document.getElementById('chatbox');
-        chatbox.innerHTML += '<p>Chatbot: ' + response + '</p>';
+        fetch('/chat', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ message: userInput })
+        }).then(function(result) {
+            if (!result.ok) {
+                throw new Error(result.status + ' ' + result.statusText);
+            }
+            var reader = result.body.getReader();
+            var decoder = new TextDecoder();
 
-        conversationHistory.push({ speaker: 'Chatbot', message: response });
+            function read() {
+                return reader.read().then(function(chunk) {
+                    if (chunk.done) {
+                        handleLine(buffer);
+                        return;
+                    }
+                    buffer += decoder.decode(chunk.value, { stream: true });
+                    var lines = buffer.split('\n');
+                    buffer = lines.pop();
+                    lines.forEach(handleLine);
+                    return read();
+                });
+            }
+            return read();
+        }).catch(function(error) {
+            response = 'Sorry, I can\'t reach the chat server right now. (' + error.message + ')';
+            text.textContent = response;
+        }).then(function() {
+            conversationHistory.push({ speaker: 'Chatbot', message: response });
+        });
     }
 
     // Additional code for displaying conversation history
@@ -60,13 +89,17 @@ document.addEventListener('DOMContentLoaded', function() {
 
         for (var i = 0; i < conversationHistory.length; i++) {
             var message = conversationHistory[i];
-            chatbox.innerHTML += '<p>' + message.speaker + ': ' + message.message + '</p>';
+            appendMessage(message.speaker, message.message);
         }
 
         chatbox.scrollTop = chatbox.scrollHeight;
     }
 
-    // Attach sendFunction to the "Send" button
+    // Attach sendFunction to the "Send" button and the Enter key
     document.getElementById('sendButton').addEventListener('click', sendFunction);
-    document.addEventListener('enter', sendFunction);
-});
\ No newline at end of file
+    document.getElementById('userInput').addEventListener('keydown', function(event) {
+        if (event.key === 'Enter') {
+            sendFunction();
+        }
+    });
+});
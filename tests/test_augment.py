@@ -8,6 +8,8 @@ from data.data_augmentation.augment import main as augment_main
 
 
 class TestAugment(unittest.TestCase):
+    @patch('data.data_augmentation.augment.embedding_index.update_embedding_index')
+    @patch('data.data_augmentation.augment.data_query.create_search_index')
     @patch('data.data_augmentation.augment.init_processing.main')
     @patch('data.data_augmentation.augment.data_query.column_exists')
     @patch('data.data_augmentation.augment.data_query.add_database_column')
@@ -17,7 +19,7 @@ class TestAugment(unittest.TestCase):
     @patch('data.data_augmentation.augment.open_database')
     @patch('data.data_augmentation.augment.close_database')
     @patch('data.data_augmentation.augment.data_generation.summarize')
-    @patch('data.data_augmentation.augment.data_generation.extract_entities')
+    @patch('data.data_augmentation.augment.data_generation.extract_entities_batch')
     @patch('data.data_augmentation.augment.data_query.retrieve_table_data')
     @patch('data.data_augmentation.augment.data_query.is_column_empty_or_null')
     def test_augment_main(
@@ -34,6 +36,8 @@ class TestAugment(unittest.TestCase):
         mock_add_database_column: MagicMock,
         mock_column_exists: MagicMock,
         mock_init_main: MagicMock,
+        mock_create_search_index: MagicMock,
+        mock_update_embedding_index: MagicMock,
     ) -> None:
 
         mock_init_main.return_value = None
@@ -44,7 +48,7 @@ class TestAugment(unittest.TestCase):
         mock_read_file_content.return_value = [('Test Title', 2020, 'Test Content')]
         mock_retrieve_id_from_database.return_value = 1
         mock_summarize.return_value = 'Test Summary'
-        mock_extract_entities.return_value = [('Python', 'Programming Language')]
+        mock_extract_entities.return_value = [[('Python', 'Programming Language')]]
         mock_open_database.return_value = (mock_conn, mock_cursor)
         mock_retrieve_table_data.return_value = [(1, 'Test Title', 2020, 'Test Content', 'Test Summary', 'Python (Programming Language)')]
         mock_cursor.fetchall.return_value = [(1, 'Test Title')]
@@ -64,9 +68,26 @@ class TestAugment(unittest.TestCase):
         mock_update_database_cell.assert_any_call(expected_path, 'essays', 1, 'summary', 'Test Summary')
         mock_update_database_cell.assert_any_call(expected_path, 'essays', 1, 'keywords', 'Python (Programming Language)')
 
+        mock_extract_entities.assert_called_once_with(['Test Title'])
+        mock_create_search_index.assert_called_once_with(expected_path, 'essays')
+        mock_update_embedding_index.assert_called_once_with(expected_path, [1])
+
         mock_open_database.assert_called_once_with(expected_path)
         mock_close_database.assert_called_once()
 
 
+    @patch('data.data_augmentation.augment.data_generation.summarize')
+    @patch('data.data_augmentation.augment.init_processing.main')
+    @patch('data.data_augmentation.augment.ingest_manifest.incremental_ingest')
+    def test_augment_main_incremental_without_changes(self, mock_incremental_ingest: MagicMock,
+                                                      mock_init_main: MagicMock, mock_summarize: MagicMock) -> None:
+        mock_incremental_ingest.return_value = []
+
+        augment_main(incremental=True)
+
+        mock_incremental_ingest.assert_called_once_with(augment.essay_db_path, augment.dataset_dir)
+        mock_init_main.assert_not_called()
+        mock_summarize.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
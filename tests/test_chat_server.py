@@ -0,0 +1,128 @@
+# tests/test_chat_server.py
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from file_setup import connection_pool
+from file_setup.init_processing import create_database, close_database
+from src.server import chat_server
+from src.server.answer_engine import AnswerEngine, NO_ANSWER, best_passage
+
+
+class ChatServerTestCase(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path: str = os.path.join(self.temp_dir.name, 'essays.db')
+        conn, cursor = create_database(self.db_path, 'essays', 'id INTEGER PRIMARY KEY, title TEXT, year INTEGER, '
+                                       'content TEXT, full_text TEXT, summary TEXT, keywords TEXT')
+        cursor.executemany("INSERT INTO essays (title, year, full_text, summary, keywords) VALUES (?, ?, ?, ?, ?)", [
+            ('Whales', 2020, 'Oceans are big. Blue whales sing long songs to each other.', 'Whales sing.',
+             'Pacific (LOC), Blue (ORG)'),
+            ('Volcanoes', 2021, 'Volcanoes erupt lava.', 'Volcanoes erupt.', 'Hawaii (GPE)'),
+        ])
+        conn.commit()
+        close_database(conn)
+        self.web_dir: str = os.path.join(self.temp_dir.name, 'web')
+        os.mkdir(self.web_dir)
+        with open(os.path.join(self.web_dir, 'Chatbot.html'), 'w') as f:
+            f.write('<html></html>')
+
+        # Use the FTS5 fallback, whatever NLTK data happens to be installed.
+        self.patcher = patch('src.server.answer_engine.nlp_resources.ensure_nltk_resources', return_value=False)
+        self.patcher.start()
+        self.engine = AnswerEngine(self.db_path, os.path.join(self.temp_dir.name, 'essays.idx'))
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        connection_pool.close_all_pools()
+        self.temp_dir.cleanup()
+
+
+class TestAnswerEngine(ChatServerTestCase):
+
+    def test_answer_quotes_best_essay(self) -> None:
+        answer = self.engine.answer('Do blue whales sing?')
+
+        self.assertTrue(answer.startswith('From "Whales" (2020): Blue whales sing long songs'))
+        self.assertIn('\nSummary: Whales sing.', answer)
+        self.assertIn('\nKeywords: Pacific (LOC), Blue (ORG)', answer)
+        self.assertEqual(self.engine.answer('quantum chromodynamics'), NO_ANSWER)
+
+    def test_best_passage_falls_back_to_first_passage(self) -> None:
+        self.assertEqual(best_passage('unrelated', 'First sentence. Second sentence.'),
+                         'First sentence. Second sentence.')
+        self.assertEqual(best_passage('anything', ''), '')
+
+
+class TestChatServer(ChatServerTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.server = await chat_server.start_server(self.engine, self.web_dir, '127.0.0.1', 0, self.executor)
+        self.port: int = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+    async def request(self, raw: bytes) -> tuple[str, bytes]:
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(raw)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        return head.decode('latin-1'), body
+
+    async def test_chat_streams_ndjson(self) -> None:
+        body = json.dumps({'message': 'Tell me about volcanoes'}).encode('utf-8')
+        head, chunked = await self.request(b'POST /chat HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'
+                                           + f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+
+        self.assertTrue(head.startswith('HTTP/1.1 200'))
+        self.assertIn('Transfer-Encoding: chunked', head)
+        payload = b''
+        while chunked:
+            size, _, rest = chunked.partition(b'\r\n')
+            payload += rest[:int(size, 16)]
+            chunked = rest[int(size, 16) + 2:]
+        events = [json.loads(line) for line in payload.splitlines()]
+        self.assertTrue(''.join(event.get('delta', '') for event in events).startswith('From "Volcanoes" (2021)'))
+        self.assertEqual(events[-1], {'done': True, 'sources': [{'id': 2, 'title': 'Volcanoes', 'year': 2021}]})
+
+    async def test_chat_rejects_bad_requests(self) -> None:
+        head, _ = await self.request(b'POST /chat HTTP/1.1\r\nConnection: close\r\nContent-Length: 3\r\n\r\n{x}')
+        self.assertTrue(head.startswith('HTTP/1.1 400'))
+
+        head, _ = await self.request(b'GET /chat HTTP/1.1\r\nConnection: close\r\n\r\n')
+        self.assertTrue(head.startswith('HTTP/1.1 405'))
+
+    async def test_serves_web_directory_only(self) -> None:
+        head, body = await self.request(b'GET / HTTP/1.1\r\nConnection: close\r\n\r\n')
+        self.assertTrue(head.startswith('HTTP/1.1 200'))
+        self.assertIn('Content-Type: text/html', head)
+        self.assertEqual(body, b'<html></html>')
+
+        head, _ = await self.request(b'GET /../essays.db HTTP/1.1\r\nConnection: close\r\n\r\n')
+        self.assertTrue(head.startswith('HTTP/1.1 404'))
+
+    async def test_keep_alive_serves_several_requests(self) -> None:
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        for _ in range(2):
+            writer.write(b'GET /Chatbot.html HTTP/1.1\r\nHost: localhost\r\n\r\n')
+            await writer.drain()
+            head = await reader.readuntil(b'\r\n\r\n')
+            self.assertTrue(head.startswith(b'HTTP/1.1 200'))
+            self.assertEqual(await reader.readexactly(len(b'<html></html>')), b'<html></html>')
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# tests/test_connection_pool.py
+
+import os
+import tempfile
+import threading
+import unittest
+
+from data.data_augmentation import data_query
+from file_setup import connection_pool
+from file_setup.init_processing import create_database, close_database
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path: str = os.path.join(self.temp_dir.name, 'pool.db')
+        conn, cursor = create_database(self.db_path, 'essays', 'id INTEGER PRIMARY KEY, title TEXT, year INTEGER')
+        cursor.executemany("INSERT INTO essays (title, year) VALUES (?, ?)", [('First', 2020), ('Second', 2021)])
+        close_database(conn)
+
+    def tearDown(self) -> None:
+        connection_pool.close_all_pools()
+        self.temp_dir.cleanup()
+
+    def test_connect_without_pool_closes_connection(self) -> None:
+        with connection_pool.connect(self.db_path) as (conn, cursor):
+            cursor.execute("SELECT COUNT(*) FROM essays")
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+        self.assertIsNone(connection_pool.get_pool(self.db_path))
+        with self.assertRaises(Exception):
+            conn.execute("SELECT 1")
+
+    def test_pooled_reuses_connection(self) -> None:
+        with connection_pool.pooled(self.db_path):
+            with connection_pool.connect(self.db_path) as (first_conn, _):
+                pass
+            with connection_pool.connect(self.db_path) as (second_conn, _):
+                pass
+
+            self.assertIs(first_conn, second_conn)
+            data_query.update_database_cell(self.db_path, 'essays', 1, 'title', 'Renamed')
+            self.assertEqual(data_query.retrieve_id_from_database(self.db_path, 'essays', 'title', 'Renamed'), 1)
+
+        self.assertIsNone(connection_pool.get_pool(self.db_path))
+        self.assertEqual(data_query.retrieve_id_from_database(self.db_path, 'essays', 'title', 'Renamed'), 1)
+
+    def test_pooled_is_reentrant(self) -> None:
+        with connection_pool.pooled(self.db_path) as outer:
+            with connection_pool.pooled(self.db_path) as inner:
+                self.assertIs(outer, inner)
+            self.assertIs(connection_pool.get_pool(self.db_path), outer)
+
+        self.assertIsNone(connection_pool.get_pool(self.db_path))
+
+    def test_pool_uses_one_connection_per_thread(self) -> None:
+        connections = {}
+
+        def worker(name: str) -> None:
+            with connection_pool.connect(self.db_path) as (conn, cursor):
+                cursor.execute("SELECT COUNT(*) FROM essays")
+                connections[name] = conn
+
+        with connection_pool.pooled(self.db_path):
+            threads = [threading.Thread(target=worker, args=(f"thread-{i}",)) for i in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len({id(conn) for conn in connections.values()}), 3)
+
+    def test_pooled_connection_rolls_back_on_error(self) -> None:
+        with connection_pool.pooled(self.db_path):
+            with self.assertRaises(RuntimeError):
+                with connection_pool.connect(self.db_path) as (conn, cursor):
+                    cursor.execute("DELETE FROM essays")
+                    raise RuntimeError("boom")
+
+            with connection_pool.connect(self.db_path) as (conn, cursor):
+                cursor.execute("SELECT COUNT(*) FROM essays")
+                self.assertEqual(cursor.fetchone()[0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
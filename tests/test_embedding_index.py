@@ -0,0 +1,103 @@
+# tests/test_embedding_index.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from file_setup.init_processing import create_database, close_database
+from src.model import embedding_index
+
+
+ESSAYS = [
+    ('Whales', 'Whales sing long songs in the deep ocean. Blue whales are the largest animals alive. '
+               'Humpback whales migrate across the ocean every year.', 'Whales sing in the ocean.'),
+    ('Volcanoes', 'Volcanoes erupt molten lava and ash. Lava flows build new islands over time. '
+                  'Ash clouds from volcanoes can ground airplanes.', 'Volcanoes erupt lava.'),
+    ('Gardens', 'Tomatoes grow best in warm sunny gardens. Gardeners water tomatoes and peppers daily. '
+                'Compost keeps garden soil rich.', 'Gardens grow tomatoes.'),
+]
+
+
+class TestEmbeddingIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path: str = os.path.join(self.temp_dir.name, 'essays.db')
+        self.index_path: str = os.path.join(self.temp_dir.name, 'essays.vec')
+        conn, cursor = create_database(self.db_path, 'essays',
+                                       'id INTEGER PRIMARY KEY, title TEXT, full_text TEXT, summary TEXT')
+        cursor.executemany("INSERT INTO essays (title, full_text, summary) VALUES (?, ?, ?)", ESSAYS)
+        conn.commit()
+        close_database(conn)
+        # Use the TF-IDF + SVD fallback, whatever spaCy models happen to be installed.
+        self.patcher = patch.object(embedding_index, 'SPACY_MODELS', ())
+        self.patcher.start()
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_chunk_text_packs_whole_sentences(self) -> None:
+        text = 'One two three. Four five. Six seven eight nine ten eleven. Twelve.'
+
+        spans = embedding_index.chunk_text(text, max_words=5)
+
+        self.assertEqual([text[start:end] for start, end in spans],
+                         ['One two three. Four five.', 'Six seven eight nine ten eleven.', 'Twelve.'])
+        self.assertEqual(embedding_index.chunk_text('   '), [])
+
+    def test_make_encoder_falls_back_to_tfidf_svd(self) -> None:
+        with patch('src.model.embedding_index.nlp_resources.get_spacy_model', side_effect=OSError):
+            encoder = embedding_index.make_encoder([text for _, text, _ in ESSAYS], ('en_core_web_sm',))
+
+        self.assertIsInstance(encoder, embedding_index.TfidfSvdEncoder)
+        self.assertEqual(encoder.encode(['whale song']).dtype, np.float32)
+
+    def test_build_search_and_load(self) -> None:
+        index = embedding_index.build_embedding_index(self.db_path, self.index_path)
+
+        results = index.search('lava from the volcano', 2)
+        self.assertEqual(results[0][0], 2)
+        essay_id, kind, start, end, score = results[0]
+        self.assertIn(kind, ('summary', 'passage'))
+        self.assertGreater(score, 0)
+
+        loaded = embedding_index.load_embedding_index(self.index_path)
+        self.assertIsInstance(loaded.vectors, np.memmap)
+        batch = loaded.search_batch(['lava from the volcano', 'tomatoes'], 2)
+        for batch_results, single_results in zip(batch, [results, index.search('tomatoes', 2)]):
+            self.assertEqual([result[:4] for result in batch_results], [result[:4] for result in single_results])
+            np.testing.assert_allclose([result[4] for result in batch_results],
+                                       [result[4] for result in single_results], rtol=1e-5)
+
+    def test_update_replaces_changed_essays(self) -> None:
+        self.assertEqual(embedding_index.update_embedding_index(self.db_path, [1], self.index_path), 0)
+        embedding_index.build_embedding_index(self.db_path, self.index_path)
+        size = os.path.getsize(self.index_path)
+
+        added = embedding_index.update_embedding_index(self.db_path, [3], self.index_path)
+
+        index = embedding_index.load_embedding_index(self.index_path)
+        self.assertEqual(len(index), len(index.items) - added)
+        self.assertEqual(os.path.getsize(self.index_path), size + added * index.dimensions * 4)
+        results = index.search('tomatoes in the garden', 10)
+        self.assertEqual(results[0][0], 3)
+        self.assertEqual(len(results), len(index))
+
+    def test_ivf_search_with_every_list_matches_exact_search(self) -> None:
+        index = embedding_index.build_embedding_index(self.db_path, self.index_path)
+        index.build_ivf(n_lists=2)
+
+        loaded = embedding_index.load_embedding_index(self.index_path)
+        self.assertEqual(loaded.centroids.shape[0], 2)
+        exact = loaded.search('whales in the ocean', 3)
+        approximate = loaded.search('whales in the ocean', 3, nprobe=2)
+        self.assertEqual([result[:4] for result in approximate], [result[:4] for result in exact])
+        np.testing.assert_allclose([result[4] for result in approximate], [result[4] for result in exact], rtol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
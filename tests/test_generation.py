@@ -5,9 +5,16 @@ from unittest.mock import MagicMock, patch, mock_open, MagicMock
 from unittest import TestCase
 
 from data.data_augmentation.data_generation import *
+from file_setup import nlp_resources
 
 class TestDataGeneration(TestCase):
 
+    def setUp(self) -> None:
+        nlp_resources.clear()
+
+    def tearDown(self) -> None:
+        nlp_resources.clear()
+
     @patch('data.data_augmentation.data_generation.nltk.download')
     def test_summarize(self, mock_nltk_download):
         text = "This is a test sentence. Another sentence for testing. Testing is important. This is extra."
@@ -22,6 +29,42 @@ class TestDataGeneration(TestCase):
         for sentence in summary_sentences:
             self.assertIn(sentence, text)
     
+    @patch('data.data_augmentation.data_generation.nlp_resources.get_stop_words', return_value=frozenset({'the', 'a', 'is'}))
+    @patch('data.data_augmentation.data_generation.nlp_resources.ensure_nltk_resources', return_value=True)
+    @patch('data.data_augmentation.data_generation.word_tokenize', side_effect=lambda sentence, preserve_line: sentence.rstrip('.').split())
+    @patch('data.data_augmentation.data_generation.sent_tokenize', side_effect=lambda text: [s.strip() + '.' for s in text.split('.') if s.strip()])
+    def test_summarize_keeps_document_order(self, mock_sent_tokenize, mock_word_tokenize, mock_ensure, mock_stop_words):
+        text = "The cat is small. Dogs bark. The cat chased the cat toy. A cat naps. Dogs bark."
+
+        summary = summarize(text, 2)
+
+        self.assertEqual(summary, "The cat is small. The cat chased the cat toy.")
+        self.assertEqual(mock_word_tokenize.call_count, 5)
+
+        summaries = summarize([text, "Birds sing. Birds fly."], 1)
+
+        self.assertEqual(summaries, ["The cat chased the cat toy.", "Birds sing."])
+
+    @patch('data.data_augmentation.data_generation.nlp_resources.ensure_nltk_resources', return_value=True)
+    @patch('data.data_augmentation.data_generation.sent_tokenize', side_effect=lambda text: [s.strip() + '.' for s in text.split('.') if s.strip()])
+    def test_summarize_tfidf(self, mock_sent_tokenize, mock_ensure):
+        texts = [
+            "Volcanoes erupt lava. My friend likes tea. Volcanoes form mountains from lava.",
+            "Whales are mammals. Whales sing songs.",
+            "",
+        ]
+        vectorizer = fit_tfidf(texts + ["Tea is a drink. Mountains are tall."])
+
+        summaries = summarize(texts, 2, method='tfidf', vectorizer=vectorizer)
+
+        self.assertEqual(summaries[0], "Volcanoes erupt lava. Volcanoes form mountains from lava.")
+        self.assertEqual(summaries[1], "Whales are mammals. Whales sing songs.")
+        self.assertEqual(summaries[2], "")
+        self.assertEqual(summarize_tfidf(texts[0], 1, vectorizer), "Volcanoes form mountains from lava.")
+
+        with self.assertRaises(ValueError):
+            summarize(texts[0], 1, method='unknown')
+
     @patch('data.data_augmentation.data_generation.spacy.load')
     def test_extract_entities(self, mock_spacy_load):
         mock_nlp = MagicMock()
@@ -38,3 +81,15 @@ class TestDataGeneration(TestCase):
 
         self.assertEqual(len(entities), 1)
         self.assertEqual(entities[0], ("Python", "ORG"))
+
+    @patch('data.data_augmentation.data_generation.nlp_resources.get_spacy_model')
+    def test_extract_entities_batch(self, mock_get_spacy_model):
+        nlp = spacy.blank('en')
+        ruler = nlp.add_pipe('entity_ruler')
+        ruler.add_patterns([{'label': 'ORG', 'pattern': 'Python'}, {'label': 'GPE', 'pattern': 'Paris'}])
+        mock_get_spacy_model.return_value = nlp
+
+        texts = ["Python is a programming language.", None, "Paris and Python."]
+        entities = extract_entities_batch(texts, batch_size=2)
+
+        self.assertEqual(entities, [[("Python", "ORG")], [], [("Paris", "GPE"), ("Python", "ORG")]])
@@ -0,0 +1,88 @@
+# tests/test_ingest_manifest.py
+
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+import docx
+
+from file_setup import ingest_manifest, init_processing
+
+
+def write_essay(essay_dir: str, file_name: str, text: str) -> str:
+    file_path = os.path.join(essay_dir, file_name)
+    doc = docx.Document()
+    doc.add_paragraph(text)
+    doc.save(file_path)
+    return file_path
+
+
+@patch('file_setup.init_processing.process_content', side_effect=lambda content, lemmatizer, stop_words: content.lower())
+@patch('file_setup.init_processing.setup_lemmatizer', return_value=(MagicMock(), set()))
+class TestIngestManifest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.essay_dir: str = os.path.join(self.temp_dir.name, 'essays')
+        os.makedirs(self.essay_dir)
+        self.db_path: str = os.path.join(self.temp_dir.name, 'essays.db')
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def fetch_essays(self) -> list[tuple]:
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT id, title, content, full_text FROM essays ORDER BY id").fetchall()
+
+    def test_only_changed_files_are_ingested(self, mock_setup_lemmatizer: MagicMock,
+                                             mock_process_content: MagicMock) -> None:
+        write_essay(self.essay_dir, 'First_Essay.docx', 'First Text')
+        second_path = write_essay(self.essay_dir, 'Second_Essay.docx', 'Second Text')
+
+        first_run = ingest_manifest.incremental_ingest(self.db_path, self.essay_dir)
+        self.assertEqual(len(first_run), 2)
+        self.assertEqual(mock_process_content.call_count, 2)
+
+        self.assertEqual(ingest_manifest.incremental_ingest(self.db_path, self.essay_dir), [])
+        self.assertEqual(mock_process_content.call_count, 2)
+        mock_setup_lemmatizer.assert_called_once()
+
+        write_essay(self.essay_dir, 'Second_Essay.docx', 'Second Text, Edited')
+        os.utime(second_path, (time.time() + 10, time.time() + 10))
+        third_run = ingest_manifest.incremental_ingest(self.db_path, self.essay_dir)
+
+        essays = self.fetch_essays()
+        self.assertEqual(len(essays), 2)
+        self.assertEqual(third_run, [essays[1][0]])
+        self.assertEqual(essays[1][1:], ('Second Essay', 'second text, edited', 'Second Text, Edited'))
+
+    def test_touched_file_with_same_hash_is_skipped(self, mock_setup_lemmatizer: MagicMock,
+                                                    mock_process_content: MagicMock) -> None:
+        file_path = write_essay(self.essay_dir, 'Essay.docx', 'Text')
+        ingest_manifest.incremental_ingest(self.db_path, self.essay_dir)
+
+        new_mtime = os.path.getmtime(file_path) + 100
+        os.utime(file_path, (new_mtime, new_mtime))
+
+        self.assertEqual(ingest_manifest.incremental_ingest(self.db_path, self.essay_dir), [])
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT mtime FROM ingest_manifest").fetchone()[0], new_mtime)
+
+    def test_existing_rows_are_adopted_by_title(self, mock_setup_lemmatizer: MagicMock,
+                                                mock_process_content: MagicMock) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(f"CREATE TABLE essays ({init_processing.ESSAY_SCHEMA})")
+            conn.execute("INSERT INTO essays (title, year, content) VALUES ('Old Essay', 2019, 'old')")
+        write_essay(self.essay_dir, 'Old_Essay.docx', 'New Text')
+
+        essay_ids = ingest_manifest.incremental_ingest(self.db_path, self.essay_dir)
+
+        self.assertEqual(essay_ids, [1])
+        self.assertEqual(self.fetch_essays(), [(1, 'Old Essay', 'new text', 'New Text')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# tests/test_ingest_pipeline.py
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import docx
+
+from file_setup import ingest_pipeline
+
+
+@patch('file_setup.init_processing.setup_lemmatizer', return_value=(MagicMock(), set()))
+class TestIngestPipeline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.essay_dir: str = os.path.join(self.temp_dir.name, 'essays')
+        os.makedirs(self.essay_dir)
+        self.db_path: str = os.path.join(self.temp_dir.name, 'essays.db')
+        for i in range(7):
+            doc = docx.Document()
+            doc.add_paragraph(f'Essay Number {i}')
+            doc.save(os.path.join(self.essay_dir, f'Essay_{i}.docx'))
+        open(os.path.join(self.essay_dir, 'notes.txt'), 'w').close()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    @patch('file_setup.init_processing.process_content',
+           side_effect=lambda content, lemmatizer, stop_words: content.lower())
+    def test_run_pipeline(self, mock_process_content: MagicMock, mock_setup_lemmatizer: MagicMock) -> None:
+        stats, insert_errors = ingest_pipeline.run_pipeline(self.essay_dir, self.db_path, batch_size=3, queue_size=2)
+
+        self.assertEqual(insert_errors, [])
+        self.assertEqual(list(stats), ['discover', 'extract', 'normalize', 'write'])
+        self.assertTrue(all(stage['items'] == 7 for stage in stats.values()))
+        self.assertIn('normalize', ingest_pipeline.format_stage_stats(stats))
+
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute("SELECT title, content FROM essays ORDER BY title").fetchall()
+        self.assertEqual(rows, [(f'Essay {i}', f'essay number {i}') for i in range(7)])
+
+    @patch('file_setup.init_processing.process_content', side_effect=ValueError("bad essay"))
+    def test_run_pipeline_raises_stage_errors(self, mock_process_content: MagicMock,
+                                              mock_setup_lemmatizer: MagicMock) -> None:
+        with self.assertRaisesRegex(ValueError, "bad essay"):
+            ingest_pipeline.run_pipeline(self.essay_dir, self.db_path, batch_size=3, queue_size=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# tests/test_inverted_index.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from file_setup.init_processing import create_database, close_database
+from src.model import inverted_index
+
+
+class TestInvertedIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path: str = os.path.join(self.temp_dir.name, 'essays.db')
+        conn, cursor = create_database(self.db_path, 'essays', 'id INTEGER PRIMARY KEY, title TEXT, content TEXT')
+        rows = [('Whales', 'whale sing ocean whale'), ('Volcanoes', 'volcano erupt island'),
+                ('Islands', 'island ocean volcano')]
+        # Enough filler essays that the common term spans several posting blocks.
+        rows += [(f'Filler {i}', f'filler word{i % 7}') for i in range(300)]
+        cursor.executemany("INSERT INTO essays (title, content) VALUES (?, ?)", rows)
+        conn.commit()
+        close_database(conn)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_search_terms_ranks_by_bm25(self) -> None:
+        index = inverted_index.build_index(self.db_path)
+
+        self.assertEqual(len(index), 303)
+        self.assertEqual([essay_id for essay_id, _ in index.search_terms(['whale'])], [1])
+        self.assertEqual([essay_id for essay_id, _ in index.search_terms(['ocean', 'volcano'], 2)], [3, 2])
+        self.assertEqual(index.search_terms(['unknown']), [])
+        self.assertEqual(index.search_terms(['whale'], 0), [])
+
+    def test_pruned_results_match_exhaustive_scoring(self) -> None:
+        index = inverted_index.build_index(self.db_path)
+        query = ['filler', 'word3', 'ocean', 'island']
+
+        scores = np.zeros(len(index))
+        for term in query:
+            term_id = index.term_ids[term]
+            docs, frequencies = index.postings(term_id)
+            scores[docs] += index._term_scores(term_id, docs, frequencies)
+        expected = [int(index.doc_ids[doc]) for doc in np.argsort(-scores, kind='stable')[:5]]
+
+        self.assertEqual([essay_id for essay_id, _ in index.search_terms(query, 5)], expected)
+
+    def test_lookup_decodes_across_blocks(self) -> None:
+        index = inverted_index.build_index(self.db_path)
+        term_id = index.term_ids['filler']
+        docs, frequencies = index.postings(term_id)
+        self.assertGreater(len(docs), inverted_index.BLOCK_SIZE * 2)
+
+        probe = np.array([0, int(docs[0]), int(docs[200]), int(docs[-1])])
+        self.assertEqual(index.lookup(term_id, probe).tolist(), [0, 1, 1, 1])
+
+    def test_save_and_load_round_trip(self) -> None:
+        index = inverted_index.build_index(self.db_path)
+        index_path = os.path.join(self.temp_dir.name, 'essays.idx')
+        index.save(index_path)
+
+        loaded = inverted_index.load_index(index_path)
+
+        self.assertEqual(loaded.terms, index.terms)
+        self.assertIsInstance(loaded.doc_gaps, np.memmap)
+        self.assertEqual(loaded.search_terms(['ocean', 'volcano', 'filler'], 10),
+                         index.search_terms(['ocean', 'volcano', 'filler'], 10))
+
+    def test_load_rejects_other_files(self) -> None:
+        index_path = os.path.join(self.temp_dir.name, 'bad.idx')
+        with open(index_path, 'wb') as f:
+            f.write(b'not an index file')
+
+        with self.assertRaises(ValueError):
+            inverted_index.load_index(index_path)
+
+    @patch('src.model.inverted_index.init_processing.process_content', return_value='whale')
+    def test_search_normalizes_query(self, mock_process_content: MagicMock) -> None:
+        index = inverted_index.build_index(self.db_path)
+        lemmatizer, stop_words = MagicMock(), {'the'}
+
+        results = index.search('The whales?', 3, lemmatizer, stop_words)
+
+        mock_process_content.assert_called_once_with('The whales?', lemmatizer, stop_words)
+        self.assertEqual([essay_id for essay_id, _ in results], [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# tests/test_lemma_cache.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from file_setup.lemma_cache import LemmaCache
+
+
+class TestLemmaCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.lemmatizer = MagicMock()
+        self.lemmatizer.lemmatize.side_effect = lambda word: word.rstrip('s')
+
+    def test_hits_and_misses(self) -> None:
+        cache = LemmaCache(maxsize=10)
+
+        self.assertEqual(cache.lemmatize('cats', self.lemmatizer), 'cat')
+        self.assertEqual(cache.lemmatize('cats', self.lemmatizer), 'cat')
+        self.assertEqual(cache.lemmatize('dogs', self.lemmatizer), 'dog')
+
+        self.assertEqual(self.lemmatizer.lemmatize.call_count, 2)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 2, 'hit_rate': 1 / 3, 'size': 2, 'maxsize': 10})
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        cache = LemmaCache(maxsize=2)
+        cache.lemmatize('cats', self.lemmatizer)
+        cache.lemmatize('dogs', self.lemmatizer)
+        cache.lemmatize('cats', self.lemmatizer)
+        cache.lemmatize('birds', self.lemmatizer)
+
+        self.assertEqual(len(cache), 2)
+        cache.lemmatize('cats', self.lemmatizer)
+        cache.lemmatize('dogs', self.lemmatizer)
+        self.assertEqual(cache.misses, 4)
+
+    def test_save_and_load(self) -> None:
+        cache = LemmaCache(maxsize=3)
+        for word in ['cats', 'dogs', 'birds']:
+            cache.lemmatize(word, self.lemmatizer)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'lemma_cache.json')
+            self.assertTrue(cache.save(path))
+
+            loaded = LemmaCache(maxsize=2)
+            self.assertEqual(loaded.load(path), 2)
+            self.assertEqual(loaded.lemmatize('birds', self.lemmatizer), 'bird')
+            self.assertEqual(loaded.hits, 1)
+            self.assertEqual(LemmaCache().load(os.path.join(temp_dir, 'missing.json')), 0)
+
+        self.assertFalse(cache.save(os.path.join(temp_dir, 'gone', 'lemma_cache.json')))
+
+
+if __name__ == '__main__':
+    unittest.main()
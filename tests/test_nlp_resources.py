@@ -0,0 +1,73 @@
+# tests/test_nlp_resources.py
+
+import unittest
+from unittest.mock import patch, MagicMock
+
+from file_setup import nlp_resources
+
+
+class TestNlpResources(unittest.TestCase):
+
+    def setUp(self) -> None:
+        nlp_resources.clear()
+
+    def tearDown(self) -> None:
+        nlp_resources.clear()
+
+    @patch('file_setup.nlp_resources.nltk.download')
+    @patch('file_setup.nlp_resources.nltk.data.find')
+    def test_installed_resources_are_not_downloaded(self, mock_find: MagicMock, mock_download: MagicMock) -> None:
+        mock_find.return_value = '/nltk_data/corpora/stopwords'
+
+        self.assertTrue(nlp_resources.ensure_nltk_resources(('stopwords', 'punkt')))
+        self.assertTrue(nlp_resources.ensure_nltk_resources(('stopwords', 'punkt')))
+
+        mock_download.assert_not_called()
+        self.assertEqual(mock_find.call_count, 2)
+
+    @patch('file_setup.nlp_resources.nltk.download')
+    @patch('file_setup.nlp_resources.nltk.data.find')
+    def test_zipped_resources_are_found(self, mock_find: MagicMock, mock_download: MagicMock) -> None:
+        mock_find.side_effect = lambda path: path if path.endswith('.zip') else (_ for _ in ()).throw(LookupError())
+
+        self.assertTrue(nlp_resources.nltk_resource_available('wordnet'))
+        mock_find.assert_called_with('corpora/wordnet.zip')
+        mock_download.assert_not_called()
+
+    @patch('file_setup.nlp_resources.nltk.download')
+    @patch('file_setup.nlp_resources.nltk.data.find', side_effect=LookupError())
+    def test_missing_resources(self, mock_find: MagicMock, mock_download: MagicMock) -> None:
+        self.assertFalse(nlp_resources.ensure_nltk_resources(('wordnet',), download=False))
+        mock_download.assert_not_called()
+
+        self.assertFalse(nlp_resources.ensure_nltk_resources(('wordnet',)))
+        mock_download.assert_called_once_with('wordnet', quiet=True)
+
+    @patch('spacy.load')
+    def test_spacy_model_is_loaded_once(self, mock_spacy_load: MagicMock) -> None:
+        mock_spacy_load.side_effect = lambda name, disable: MagicMock(name=f"{name}-{disable}")
+
+        first = nlp_resources.get_spacy_model('en_core_web_sm')
+        second = nlp_resources.get_spacy_model('en_core_web_sm')
+        without_parser = nlp_resources.get_spacy_model('en_core_web_sm', disable=['parser'])
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, without_parser)
+        self.assertEqual(mock_spacy_load.call_count, 2)
+        mock_spacy_load.assert_called_with('en_core_web_sm', disable=['parser'])
+
+    @patch('file_setup.nlp_resources.ensure_nltk_resources', return_value=True)
+    def test_stop_words_are_loaded_once(self, mock_ensure: MagicMock) -> None:
+        # The NLTK corpus loader can't be patched with patch() itself, since inspecting it loads the corpus.
+        mock_stopwords = MagicMock()
+        mock_words = mock_stopwords.words
+        mock_words.return_value = ['the', 'a']
+
+        with patch.dict(nlp_resources.__dict__, {'stopwords': mock_stopwords}):
+            self.assertEqual(nlp_resources.get_stop_words(), frozenset({'the', 'a'}))
+            self.assertIs(nlp_resources.get_stop_words(), nlp_resources.get_stop_words())
+        mock_words.assert_called_once_with('english')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 # tests/test_preprocessing.py
 
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from typing import cast
@@ -23,6 +24,19 @@ class TestPreprocessing(unittest.TestCase):
         processed_content = process_content(content, lemmatizer, stop_words)
         self.assertEqual(processed_content, expected_content)
 
+    @patch('file_setup.init_processing.word_tokenize')
+    def test_process_content_uses_lemma_cache(self, mock_word_tokenize: MagicMock) -> None:
+        mock_word_tokenize.return_value = ['The', 'Cats', 'saw', 'cats', ',', 'and', '3', 'cats', '.']
+        lemmatizer = MagicMock()
+        lemmatizer.lemmatize.side_effect = lambda word: word.rstrip('s')
+        cache = LemmaCache(maxsize=10)
+
+        processed_content = process_content('ignored', lemmatizer, {'the', 'and'}, cache=cache)
+
+        self.assertEqual(processed_content, 'cat saw cat cat')
+        self.assertEqual(lemmatizer.lemmatize.call_count, 2)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
     def test_create_database(self) -> None:
         test_db_path_local: str = os.path.join(test_dir, 'test.db')
 
@@ -94,6 +108,32 @@ class TestPreprocessing(unittest.TestCase):
 
         self.assertEqual(len(file_contents), 2)
 
+    def test_read_file_content_workers(self) -> None:
+        from odf.opendocument import OpenDocumentText
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(3):
+                doc = docx.Document()
+                doc.add_paragraph(f'Docx essay {i}.')
+                doc.add_paragraph('Second paragraph.')
+                doc.save(os.path.join(temp_dir, f'docx_essay_{i}.docx'))
+
+                odt = OpenDocumentText()
+                odt.text.addElement(odf_text.P(text=f'Odt essay {i}.'))
+                odt.save(os.path.join(temp_dir, f'odt_essay_{i}.odt'))
+            open(os.path.join(temp_dir, 'notes.txt'), 'w').close()
+
+            serial = read_file_content(temp_dir)
+            parallel = read_file_content(temp_dir, workers=2)
+            streamed = iter_file_content(temp_dir, workers=2)
+
+            self.assertEqual(len(serial), 6)
+            self.assertEqual(serial, parallel)
+            self.assertEqual(next(streamed), serial[0])
+            streamed.close()
+            self.assertIn(('docx essay 1', serial[0][1], 'Docx essay 1. Second paragraph.'), serial)
+            self.assertIn(('odt essay 2', serial[0][1], 'Odt essay 2.'), serial)
+
     @patch('file_setup.init_processing.sqlite3.Connection')
     @patch('file_setup.init_processing.sqlite3.Cursor')
     def test_insert_into_database(self, mock_cursor: MagicMock, mock_connection: MagicMock) -> None:
@@ -111,6 +151,22 @@ class TestPreprocessing(unittest.TestCase):
         mock_cur.execute.assert_called_with('INSERT INTO essays (title, year, content) VALUES (?, ?, ?)', data[0])
         mock_conn.commit.assert_called()
 
+    def test_bulk_insert_into_database(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            conn, cursor = create_database(os.path.join(temp_dir, 'bulk.db'), 'essays',
+                                           'id INTEGER PRIMARY KEY, title TEXT NOT NULL, year INTEGER, content TEXT')
+            data = [(f'title {i}', 2000 + i, f'content {i}') for i in range(10)]
+            data[4] = (None, 2004, 'missing title')
+
+            errors = bulk_insert_into_database(iter(data), conn, 'essays', chunk_size=3, fast_load=True)
+
+            self.assertEqual([index for index, _ in errors], [4])
+            self.assertIn('NOT NULL', errors[0][1])
+            self.assertEqual(cursor.execute("SELECT COUNT(*) FROM essays").fetchone()[0], 9)
+            self.assertEqual(cursor.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+            self.assertFalse(conn.in_transaction)
+            conn.close()
+
     @patch('file_setup.init_processing.insert_into_database')
     @patch('file_setup.init_processing.process_content')
     @patch('file_setup.init_processing.read_file_content')
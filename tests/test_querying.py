@@ -1,6 +1,8 @@
 # tests/test_querying.py
 
 import os
+import sqlite3
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 
@@ -256,6 +258,39 @@ class TestDataQuery(unittest.TestCase):
         mock_cursor.execute.assert_called_with("SELECT * FROM dummy_table")
 
 
+    def test_search_essays(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'search.db')
+            conn = sqlite3.connect(db_path)
+            conn.execute("CREATE TABLE essays (id INTEGER PRIMARY KEY, title TEXT, year INTEGER, content TEXT, "
+                         "full_text TEXT, summary TEXT, keywords TEXT)")
+            conn.executemany("INSERT INTO essays VALUES (?, ?, ?, ?, ?, ?, ?)", [
+                (1, 'Whales', 2020, 'whale sing', 'Whales sing to each other.', 'Whales sing.', 'Pacific (LOC)'),
+                (2, 'Volcanoes', 2021, 'volcano erupt', 'Volcanoes erupt.', 'Volcanoes erupt.', 'Hawaii (GPE)'),
+            ])
+            conn.commit()
+            conn.close()
+
+            data_query.create_search_index(db_path, 'essays')
+            data_query.create_search_index(db_path, 'essays')
+
+            results = data_query.search_essays("What about the whales?", 5, db_path)
+            self.assertEqual([(essay_id, title) for essay_id, title, _, _ in results], [(1, 'Whales')])
+            self.assertIn('[', results[0][3])
+            self.assertEqual(data_query.search_essays("the?!", 5, db_path), [])
+
+            data_query.update_database_cell(db_path, 'essays', 2, 'keywords', 'Whale watching (EVENT)')
+            self.assertEqual({row[0] for row in data_query.search_essays("whale", 5, db_path)}, {1, 2})
+
+            data_query.delete_row_by_id(db_path, 'essays', 1)
+            data_query.insert_into_database(db_path, 'essays', ['title', 'full_text'], [('Geysers', 'Geysers erupt.')])
+            self.assertEqual([row[1] for row in data_query.search_essays("erupt", 5, db_path)],
+                             ['Volcanoes', 'Geysers'])
+
+            data_query.drop_database_column(db_path, 'essays', 'summary')
+            with sqlite3.connect(db_path) as conn:
+                self.assertIsNone(conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'essays_fts'").fetchone())
+
 if __name__ == '__main__':
     unittest.main()
 